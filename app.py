@@ -1,41 +1,35 @@
 # app.py (Part 1: New Google Places API Integration)
 
-from json.tool import main
 import streamlit as st
-import requests
-import json
-import folium
-from streamlit_folium import folium_static
-from geopy.geocoders import Nominatim
-from geopy.distance import geodesic # Changed from 'distance' to 'geodesic' for direct use
 import datetime # Import datetime for date inputs
 import os # Import os for environment variables
 
 # Import functions from src/
-from src.sentiment_model import load_sentiment_model, get_place_reviews_with_sentiment # Import sentiment analysis function
+from src.sentiment_model import start_sentiment_warmup, get_place_reviews_with_sentiment # Import sentiment analysis function
+from src.sentiment_fast import FAST_SENTIMENT_MODEL_ID
+from src.sentiment_store import get_place_sentiment, has_fast_model_labels, save_place_sentiment
 # Removed get_precise_location_gcloud_http from import list as it's no longer used
-from src.location_detection import get_coordinates, get_location_name, display_map
+from src.location_detection import resolve_location
+from src.gazetteer import get_gazetteer, normalize_name
+from src.map_view import display_map, display_places_map
+from src.errors import ExplorerError
 from src.explorer_utils import (
-    google_places_text_search_new,
     google_places_details_new,
-    fetch_place_photos,
+    load_place_detail_tier,
+    fetch_place_photo_image,
     find_nearby_attractions
 )
+from src.place_prefetcher import PlaceDetailsPrefetcher, PREFETCH_TOP_N, PREFETCH_MAX_WORKERS
+from src.place_catalogue import get_place_catalogue, CITY_ID_PREFIX
 
 
 # --- Configuration ---
 st.set_page_config(layout="wide", page_title="Explorer of India")
 
 
-# --- Import sentiment_model AFTER set_page_config ---
-sentiment_model_available = False
-sentiment_pipeline = None # Initialize to None
-try:
-    sentiment_pipeline = load_sentiment_model()
-    sentiment_model_available = True
-except Exception as e:
-    st.error(f"Error during sentiment model import or loading: {e}")
-    sentiment_model_available = False
+# --- Load the sentiment model in the background ---
+# Pages render right away; review sentiment shows a placeholder until the model is ready.
+sentiment_warmup = start_sentiment_warmup()
 
 
 # Replace with your Google Cloud API key that has access to the NEW Places API
@@ -229,15 +223,69 @@ if 'place_sentiment_cache' not in st.session_state:
 if 'budget_filter' not in st.session_state:
     st.session_state.budget_filter = 'Any' # Using a string label
 
+if 'place_search_stream' not in st.session_state:
+    st.session_state.place_search_stream = None # Generator yielding further result pages of the current search
+if 'place_search_options' not in st.session_state:
+    st.session_state.place_search_options = {}
+
+if 'details_prefetcher' not in st.session_state:
+    # Background fetcher for the top search results, one per session
+    st.session_state.details_prefetcher = PlaceDetailsPrefetcher(
+        GOOGLE_PLACES_BASE_URL, GOOGLE_CLOUD_API_KEY,
+        top_n=PREFETCH_TOP_N, max_workers=PREFETCH_MAX_WORKERS
+    )
+
 
 # --- Helper functions for navigation (within app.py) ---
+def call_api(fn, *args, **kwargs):
+    """
+    Calls a core API function and shows its error on the page instead of raising.
+    Returns None if the call failed.
+    """
+    try:
+        return fn(*args, **kwargs)
+    except ExplorerError as e:
+        st.error(str(e))
+        return None
+
+
+@st.fragment(run_every=1)
+def render_sentiment_pending(reviews_data):
+    """Shows the reviews while the sentiment model loads, then reruns the page to score them."""
+    if sentiment_warmup.is_ready():
+        st.rerun()
+    st.info("Scoring reviews… (the sentiment model is still loading)")
+    for review in reviews_data[:5]:
+        st.write(f"- '{review.get('text', {}).get('text', 'No review text.')}'")
+
+
 def on_place_select(place_id):
-    st.session_state.selected_place_details = google_places_details_new(place_id, GOOGLE_PLACES_BASE_URL, GOOGLE_CLOUD_API_KEY)
+    # Use prefetched details if the background fetch has finished (or is about to)
+    place_details = st.session_state.details_prefetcher.get(place_id, wait_timeout=2)
+    if place_details is None:
+        place_details = call_api(google_places_details_new, place_id, GOOGLE_PLACES_BASE_URL, GOOGLE_CLOUD_API_KEY, tier='light')
+    st.session_state.selected_place_details = place_details
     if st.session_state.selected_place_details:
         st.session_state.step2_view = 'place_details'
     st.rerun()
 
 
+def start_place_search(query, location_bias, track_categories=False, apply_budget_filter=False):
+    """
+    Starts a paginated search. The place list view renders each page as it arrives
+    instead of waiting for the whole result set. Queries recently answered by the API
+    for this area are served from the local place catalogue.
+    """
+    st.session_state.api_place_list = []
+    st.session_state.place_search_stream = get_place_catalogue().search_pages(
+        query, location_bias=location_bias, api_base_url=GOOGLE_PLACES_BASE_URL, api_key=GOOGLE_CLOUD_API_KEY
+    )
+    st.session_state.place_search_options = {
+        'track_categories': track_categories, # Only searches typed by the user feed recommendations
+        'apply_budget_filter': apply_budget_filter
+    }
+
+
 # --- NEW: Category Mapping for Recommendations ---
 # This maps Google Places API types to your broader categories for recommendation
 API_TYPE_TO_CATEGORY_MAP = {
@@ -302,20 +350,36 @@ if st.session_state.step == 1:
             key="manual_input_step1",
             label_visibility="collapsed"
         )
+        # Suggestions come from the local gazetteer and carry their coordinates,
+        # so picking one needs no geocoding request
+        suggestions = get_gazetteer().suggest(st.session_state.manual_location_input)
+        if suggestions:
+            st.caption("Did you mean:")
+            for suggestion in suggestions:
+                # Keyed by name: the list is recomputed on the click's rerun and may have changed order
+                if st.button(suggestion['label'], key=f"location_suggestion_{normalize_name(suggestion['name'])}"):
+                    get_gazetteer().record_use(suggestion['name'])
+                    st.session_state.manual_location_input = suggestion['name']
+                    st.session_state.location_data = {
+                        'lat': suggestion['lat'], 'lon': suggestion['lng'], 'name': suggestion['label']
+                    }
+                    st.rerun()
+
         if st.button("Confirm Manual Location", key="geocode_manual_btn_step1"):
             manual_location = st.session_state.manual_location_input
             if manual_location:
                 with st.spinner(f"Finding '{manual_location}'..."):
-                    lat_manual, lon_manual = get_coordinates(manual_location)
-                    if lat_manual is not None and lon_manual is not None:
-                        location_name = get_location_name(lat_manual, lon_manual)
-                        st.session_state.location_data = {
-                            'lat': lat_manual, 'lon': lon_manual, 'name': location_name
-                        }
-                        st.success(f"Location Confirmed: {location_name}")
-                        st.rerun()
-                    else:
-                        st.error(f"Could not find coordinates for '{manual_location}'. Please try again.")
+                    resolved = call_api(resolve_location, manual_location)
+                    if resolved is not None:  # Otherwise call_api has shown why (e.g. rate limited)
+                        lat_manual, lon_manual, location_name = resolved
+                        if lat_manual is not None and lon_manual is not None:
+                            st.session_state.location_data = {
+                                'lat': lat_manual, 'lon': lon_manual, 'name': location_name
+                            }
+                            st.success(f"Location Confirmed: {location_name}")
+                            st.rerun()
+                        else:
+                            st.error(f"Could not find coordinates for '{manual_location}'. Please try again.")
             else:
                 st.warning("Please enter a location in the text box first.")
 
@@ -458,37 +522,8 @@ elif st.session_state.step == 2:
                     }
                 }
 
-            places = google_places_text_search_new(search_term, location_bias=location_bias, api_base_url=GOOGLE_PLACES_BASE_URL, api_key=GOOGLE_CLOUD_API_KEY)
-
-            if places is not None:
-                # --- NEW: Update category counts based on API results ---
-                for place in places:
-                    if 'types' in place:
-                        # Use the new get_broad_category_from_api_types function that returns a list
-                        broad_categories = get_broad_category_from_api_types(place['types'])
-                        for broad_category in broad_categories: # Iterate through all found broad categories
-                            if broad_category:
-                                st.session_state['category_counts'][broad_category] = st.session_state['category_counts'].get(broad_category, 0) + 1
-                # --- END NEW ---
-
-                selected_budget_label = st.session_state.budget_filter
-                if selected_budget_label != 'Any':
-                    target_price_level = PRICE_LEVEL_REVERSE_MAP.get(selected_budget_label)
-                    if target_price_level is not None:
-                        filtered_places = [
-                            p for p in places
-                            if p.get('priceLevel') is None or p.get('priceLevel') == target_price_level
-                        ]
-                    else:
-                        filtered_places = places
-                else:
-                    filtered_places = places
-
-                st.session_state.api_place_list = filtered_places
-                st.rerun()
-            else:
-                st.error("Could not retrieve places from Google Places API.")
-                st.rerun() # Rerun to clear spinner and display error
+            start_place_search(search_term, location_bias, track_categories=True, apply_budget_filter=True)
+            st.rerun()
 
     # --- NEW: Personalized Recommendation Display Logic ---
     # This block comes *after* the search button handling but before explore_options/place_list views
@@ -521,7 +556,7 @@ elif st.session_state.step == 2:
                                 'radius': 50000
                             }
                         }
-                    st.session_state.api_place_list = google_places_text_search_new(recommended_category_to_show, location_bias=location_bias, api_base_url=GOOGLE_PLACES_BASE_URL, api_key=GOOGLE_CLOUD_API_KEY)
+                    start_place_search(recommended_category_to_show, location_bias)
                     
                     # Mark this category as shown so it doesn't reappear immediately
                     st.session_state['recommended_categories_shown'].add(recommended_category_to_show)
@@ -551,7 +586,7 @@ elif st.session_state.step == 2:
                                         'radius': 50000
                                     }
                                 }
-                            st.session_state.api_place_list = google_places_text_search_new(place_type, location_bias=location_bias, api_base_url=GOOGLE_PLACES_BASE_URL, api_key=GOOGLE_CLOUD_API_KEY)
+                            start_place_search(place_type, location_bias)
                             st.rerun()
 
         st.markdown("### Popular Places")
@@ -573,28 +608,97 @@ elif st.session_state.step == 2:
                                         'radius': 50000
                                     }
                                 }
-                            st.session_state.api_place_list = google_places_text_search_new(query, location_bias=location_bias, api_base_url=GOOGLE_PLACES_BASE_URL, api_key=GOOGLE_CLOUD_API_KEY)
+                            start_place_search(query, location_bias)
                             st.rerun()
 
     elif st.session_state.step2_view == 'place_list':
         st.subheader("Search Results")
+
+        def prefetchable_places(places):
+            # Dataset cities from the local catalogue have no Places details to fetch
+            return [p for p in places if not p['id'].startswith(CITY_ID_PREFIX)]
+
+        def render_place_list_item(place):
+            with st.container():
+                st.markdown(f"##### {place.get('displayName', {}).get('text', 'N/A')}")
+                st.write(f"Address: {place.get('formattedAddress', 'N/A')}")
+                if place['id'].startswith(CITY_ID_PREFIX):
+                    city_name = place['displayName']['text']
+                    if st.button(f"Explore {city_name}", key=f"explore_city_{place['id']}"):
+                        query = f"tourist attractions in {city_name}"
+                        st.session_state.search_term_input = query
+                        start_place_search(query, {
+                            'circle': {
+                                'center': place['location'],
+                                'radius': 50000
+                            }
+                        })
+                        st.rerun()
+                    return
+                if 'rating' in place:
+                    st.write(f"Rating: {place['rating']} ({place.get('userRatingCount', 0)} reviews)")
+                if 'priceLevel' in place:
+                    st.write(f"Price: {PRICE_LEVEL_MAP.get(place['priceLevel'], 'N/A')}")
+                if st.button(f"View Details for {place.get('displayName', {}).get('text', 'N/A')}", key=f"details_{place['id']}"):
+                    on_place_select(place['id'])
+
+        for place in st.session_state.api_place_list:
+            render_place_list_item(place)
+
+        # --- Render the remaining pages of a running search as they arrive ---
+        if st.session_state.place_search_stream is not None:
+            search_options = st.session_state.place_search_options
+            try:
+                for page in st.session_state.place_search_stream:
+                    if search_options.get('track_categories'):
+                        # --- NEW: Update category counts based on API results ---
+                        for place in page:
+                            if 'types' in place:
+                                # Use the new get_broad_category_from_api_types function that returns a list
+                                broad_categories = get_broad_category_from_api_types(place['types'])
+                                for broad_category in broad_categories: # Iterate through all found broad categories
+                                    if broad_category:
+                                        st.session_state['category_counts'][broad_category] = st.session_state['category_counts'].get(broad_category, 0) + 1
+                        # --- END NEW ---
+
+                    selected_budget_label = st.session_state.budget_filter
+                    if search_options.get('apply_budget_filter') and selected_budget_label != 'Any':
+                        target_price_level = PRICE_LEVEL_REVERSE_MAP.get(selected_budget_label)
+                        if target_price_level is not None:
+                            page = [
+                                p for p in page
+                                if p.get('priceLevel') is None or p.get('priceLevel') == target_price_level
+                            ]
+
+                    st.session_state.api_place_list.extend(page)
+                    st.session_state.details_prefetcher.prefetch(
+                        st.session_state.search_term_input, prefetchable_places(st.session_state.api_place_list)
+                    )
+                    for place in page:
+                        render_place_list_item(place)
+            except ExplorerError as e:
+                st.error(str(e))
+            st.session_state.place_search_stream = None
+
         if st.session_state.api_place_list:
-            for place in st.session_state.api_place_list:
-                with st.container():
-                    st.markdown(f"##### {place.get('displayName', {}).get('text', 'N/A')}")
-                    st.write(f"Address: {place.get('formattedAddress', 'N/A')}")
-                    if 'rating' in place:
-                        st.write(f"Rating: {place['rating']} ({place.get('userRatingCount', 0)} reviews)")
-                    if 'priceLevel' in place:
-                        st.write(f"Price: {PRICE_LEVEL_MAP.get(place['priceLevel'], 'N/A')}")
-                    if st.button(f"View Details for {place.get('displayName', {}).get('text', 'N/A')}", key=f"details_{place['id']}"):
-                        on_place_select(place['id'])
+            # Warm up details for the top results while the list is being read
+            st.session_state.details_prefetcher.prefetch(
+                st.session_state.search_term_input, prefetchable_places(st.session_state.api_place_list)
+            )
+            # One clustered map for the whole list
+            with st.expander("Show results on a map"):
+                try:
+                    display_places_map(st.session_state.api_place_list)
+                except Exception as e:
+                    st.error(f"Error displaying map: {e}")
         else:
             st.info("No places found for your search. Try a different query.")
 
         if st.button("Back to Search/Explore Options", key="back_to_explore_options"):
+            st.session_state.details_prefetcher.cancel()
             st.session_state.step2_view = 'explore_options'
             st.session_state.api_place_list = [] # Clear the list
+            st.session_state.place_search_stream = None
             st.session_state.selected_place_details = None
             st.session_state.current_place_list_query = None
             st.rerun()
@@ -633,25 +737,10 @@ elif st.session_state.step == 2:
 
                 st.write(f"**Address:** {place_details.get('formattedAddress', 'No address available.')}")
 
-                # Opening Hours
-                opening_hours = place_details.get('regularOpeningHours', {}).get('weekdayDescriptions')
-                if opening_hours:
-                    st.write("**Opening Hours:**")
-                    for day_desc in opening_hours:
-                        st.write(f"- {day_desc}")
-                else:
-                    st.write("**Opening Hours:** Not available.")
-
-                # Accessibility Options
-                accessibility = place_details.get('accessibilityOptions')
-                if accessibility:
-                    st.write("**Accessibility Options:**")
-                    for key, value in accessibility.items():
-                        if value: # Only show true options
-                            # Format key for better readability (e.g., wheelchair_accessible_parking -> Wheelchair Accessible Parking)
-                            st.write(f"- {key.replace('wheelchair_', '').replace('_', ' ').title()}")
-                else:
-                    st.write("**Accessibility:** Not available.")
+                # Opening Hours and Accessibility belong to the heavy field tier;
+                # reserve their space now and fill it once those fields are loaded below.
+                heavy_info_placeholder = st.empty()
+                heavy_info_placeholder.caption("Loading opening hours and accessibility...")
 
                 # Website
                 website_uri = place_details.get('websiteUri')
@@ -685,6 +774,7 @@ elif st.session_state.step == 2:
                     # Calculate distance and display
                     if user_lat is not None and user_lon is not None:
                         try:
+                            from geopy.distance import geodesic # Imported on first use to keep startup fast
                             dist_km = geodesic((user_lat, user_lon), (place_lat, place_lon)).km
                             st.markdown(f"<p class='distance-display'>{int(dist_km):,} km</p>", unsafe_allow_html=True)
                         except Exception as e:
@@ -706,6 +796,34 @@ elif st.session_state.step == 2:
                 else:
                     st.info("Map location or your current location not available to display map or directions.")
 
+            # --- Lazily load the heavy tier (hours, accessibility, photos, reviews) ---
+            with st.spinner("Loading photos and reviews..."):
+                place_details = call_api(
+                    load_place_detail_tier, place_details, 'heavy', GOOGLE_PLACES_BASE_URL, GOOGLE_CLOUD_API_KEY
+                ) or place_details
+            st.session_state.selected_place_details = place_details
+
+            with heavy_info_placeholder.container():
+                # Opening Hours
+                opening_hours = place_details.get('regularOpeningHours', {}).get('weekdayDescriptions')
+                if opening_hours:
+                    st.write("**Opening Hours:**")
+                    for day_desc in opening_hours:
+                        st.write(f"- {day_desc}")
+                else:
+                    st.write("**Opening Hours:** Not available.")
+
+                # Accessibility Options
+                accessibility = place_details.get('accessibilityOptions')
+                if accessibility:
+                    st.write("**Accessibility Options:**")
+                    for key, value in accessibility.items():
+                        if value: # Only show true options
+                            # Format key for better readability (e.g., wheelchair_accessible_parking -> Wheelchair Accessible Parking)
+                            st.write(f"- {key.replace('wheelchair_', '').replace('_', ' ').title()}")
+                else:
+                    st.write("**Accessibility:** Not available.")
+
             st.write("---")
             st.markdown("### Photos")
             photos = place_details.get('photos', [])
@@ -715,9 +833,9 @@ elif st.session_state.step == 2:
                 photo_cols = st.columns(display_photos_count)
                 for i, photo in enumerate(photos[:display_photos_count]):
                     with photo_cols[i]:
-                        photo_url = fetch_place_photos(photo['name'], GOOGLE_CLOUD_API_KEY)
-                        if photo_url:
-                            st.image(photo_url, caption=f"Photo {i+1}", use_container_width=True) # Corrected parameter
+                        photo_image = call_api(fetch_place_photo_image, photo['name'], GOOGLE_CLOUD_API_KEY)
+                        if photo_image:
+                            st.image(photo_image, caption=f"Photo {i+1}", use_container_width=True) # Served from the local photo store
                         else:
                             st.image(f"https://placehold.co/150x100/aabbcc/000000?text=No+Image", caption="Image Unavailable", use_container_width=True)
             else:
@@ -728,8 +846,24 @@ elif st.session_state.step == 2:
             if 'reviews' in place_details: # Check if reviews exist in place_details
                 reviews_data = place_details['reviews']
                 if reviews_data: # Check if reviews_data is not empty
-                    if sentiment_model_available:
-                        sentiment_summary = get_place_reviews_with_sentiment(sentiment_pipeline, reviews_data) # Pass pipeline
+                    # Reruns of the same page reuse the summary, and places pre-scored by
+                    # prescore_reviews.py (or opened by anyone this week) need no model at all
+                    sentiment_summary = (
+                        st.session_state.place_sentiment_cache.get(place_details['id'])
+                        or get_place_sentiment(place_details['id'])
+                    )
+                    model_ready = sentiment_warmup.is_ready()
+                    sentiment_pipeline = sentiment_warmup.get(timeout=0)
+                    if sentiment_summary is None and not model_ready:
+                        render_sentiment_pending(reviews_data)
+                    elif sentiment_summary is not None or sentiment_pipeline is not None:
+                        if sentiment_summary is None:
+                            # Other sessions share the on-disk review scores
+                            sentiment_summary = call_api(get_place_reviews_with_sentiment, sentiment_pipeline, reviews_data) # Pass pipeline
+                            save_place_sentiment(place_details['id'], sentiment_summary)
+                        # Quick estimates are shown but not kept, so the next view asks the transformer again
+                        if sentiment_summary is not None and not has_fast_model_labels(sentiment_summary):
+                            st.session_state.place_sentiment_cache[place_details['id']] = sentiment_summary
                         if sentiment_summary and sentiment_summary.get('total_analyzed', 0) > 0: # Check if any reviews were analyzed
                             st.markdown(f"<div class='sentiment-box'>", unsafe_allow_html=True)
                             st.markdown(f"**Overall Sentiment:** {sentiment_summary.get('overall_category', 'N/A')}")
@@ -742,6 +876,8 @@ elif st.session_state.step == 2:
                             for i, r_sent in enumerate(sentiment_summary['individual_results'][:5]):
                                 review_text = r_sent['review']
                                 sentiment_label = r_sent['sentiment']['label'] if r_sent['sentiment'] else "N/A (Analysis Failed)"
+                                if r_sent['sentiment'] and r_sent['sentiment'].get('model') == FAST_SENTIMENT_MODEL_ID:
+                                    sentiment_label += ", quick estimate" # Scored by the fast model under load
                                 st.write(f"- '{review_text}' ({sentiment_label})")
                             if len(sentiment_summary['individual_results']) > 5:
                                 st.info(f"Displaying first 5 reviews out of {len(sentiment_summary['individual_results'])}.")
@@ -754,7 +890,7 @@ elif st.session_state.step == 2:
                             if len(reviews_data) > 5:
                                 st.info(f"Displaying first 5 raw reviews out of {len(reviews_data)}.")
                     else:
-                        st.warning("Sentiment analysis model not loaded. Cannot perform sentiment analysis on reviews.")
+                        st.warning(f"Sentiment analysis model not loaded ({sentiment_warmup.error}). Cannot perform sentiment analysis on reviews.")
                         st.markdown("#### Raw Reviews (Sentiment Analysis Disabled):")
                         for i, review in enumerate(reviews_data[:5]): # Display raw reviews if sentiment model is not available
                             st.write(f"- '{review.get('text', 'No review text.')}'")
@@ -771,7 +907,7 @@ elif st.session_state.step == 2:
             if place_details.get('location'):
                 place_lat = place_details['location']['latitude']
                 place_lon = place_details['location']['longitude']
-                nearby_attractions = find_nearby_attractions(place_lat, place_lon, GOOGLE_PLACES_BASE_URL, GOOGLE_CLOUD_API_KEY)
+                nearby_attractions = call_api(find_nearby_attractions, place_lat, place_lon, GOOGLE_PLACES_BASE_URL, GOOGLE_CLOUD_API_KEY)
                 if nearby_attractions:
                     # Display at most 5 nearby attractions
                     display_attractions_count = min(len(nearby_attractions), 5)
@@ -784,7 +920,7 @@ elif st.session_state.step == 2:
                             with attraction_cols[1]:
                                 if st.button(f"View Details", key=f"nearby_details_{attraction['id']}"):
                                     st.session_state.originating_place_id = place_details['id']
-                                    st.session_state.selected_place_details = google_places_details_new(attraction['id'], GOOGLE_PLACES_BASE_URL, GOOGLE_CLOUD_API_KEY)
+                                    st.session_state.selected_place_details = call_api(google_places_details_new, attraction['id'], GOOGLE_PLACES_BASE_URL, GOOGLE_CLOUD_API_KEY, tier='light')
                                     st.rerun()
                         st.markdown("---") # Separator for each attraction
                 else:
@@ -796,7 +932,7 @@ elif st.session_state.step == 2:
             if st.session_state.originating_place_id:
                 # This means we clicked a nearby attraction, so go back to the original place's details
                 if st.button("Back to Previous Place Details", key="back_to_originating_place"):
-                    st.session_state.selected_place_details = google_places_details_new(st.session_state.originating_place_id, GOOGLE_PLACES_BASE_URL, GOOGLE_CLOUD_API_KEY)
+                    st.session_state.selected_place_details = call_api(google_places_details_new, st.session_state.originating_place_id, GOOGLE_PLACES_BASE_URL, GOOGLE_CLOUD_API_KEY, tier='light')
                     if st.session_state.selected_place_details:
                         st.session_state.originating_place_id = None # Clear this so next 'Back' goes to list
                         st.rerun()
@@ -0,0 +1,158 @@
+"""
+Compares the sentiment backends (see EXPLORER_SENTIMENT_BACKEND) on the same reviews:
+label agreement with the PyTorch model, model load time, batch latency and peak
+resident memory. Each backend runs in its own process so memory figures are not mixed.
+
+    python benchmark_sentiment.py --texts-file reviews.txt --batch-size 16
+
+Without --texts-file, review texts are collected from recorded Places fixtures
+(see src/transport.py), topped up with a few built-in samples.
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.transport import FIXTURES_DIR
+
+BACKENDS = ['pytorch', 'onnx-int8']
+SAMPLE_REVIEWS = [
+    "Beautiful temple with amazing architecture, a must visit.",
+    "Too crowded and the queues were endless. Not worth the time.",
+    "The beach was clean and the sunset was lovely.",
+    "Staff were rude and the place was dirty.",
+    "Decent place, nothing special but okay for a short stop.",
+    "Absolutely stunning views from the top of the hill, the trek was worth every step.",
+    "Parking was a nightmare and the food stalls overcharged us.",
+    "Peaceful and well maintained gardens, great for families with kids.",
+]
+
+
+def load_benchmark_texts(texts_file=None, fixtures_dir=FIXTURES_DIR, limit=200):
+    """Returns up to limit review texts from a file (one per line) or from recorded fixtures."""
+    if texts_file:
+        with open(texts_file, encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()][:limit]
+
+    texts = []
+    for path in glob.glob(os.path.join(fixtures_dir, "places.googleapis.com", "*.json")):
+        with open(path, encoding='utf-8') as f:
+            fixture = json.load(f)
+        try:
+            body = json.loads(fixture['response'].get('text') or '{}')
+        except ValueError:
+            continue
+        for review in body.get('reviews', []) if isinstance(body, dict) else []:
+            text = review.get('text', {}).get('text')
+            if text:
+                texts.append(text)
+    texts = list(dict.fromkeys(texts))  # Drop duplicates, keep order
+    while len(texts) < limit:
+        texts.extend(SAMPLE_REVIEWS[:limit - len(texts)])
+    return texts[:limit]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+def run_worker(backend, texts_path, batch_size, repeats):
+    """Loads one backend, scores the texts and prints the measurements as JSON."""
+    from src.sentiment_model import load_sentiment_model
+
+    with open(texts_path, encoding='utf-8') as f:
+        texts = json.load(f)
+
+    start = time.perf_counter()
+    sentiment_pipeline = load_sentiment_model(backend)
+    load_seconds = time.perf_counter() - start
+    rss_after_load = peak_rss_mb()
+
+    sentiment_pipeline(texts[:batch_size], batch_size=batch_size, truncation=True)  # Warm-up
+
+    batch_latencies = []
+    labels = []
+    for repeat in range(repeats):
+        for i in range(0, len(texts), batch_size):
+            start = time.perf_counter()
+            results = sentiment_pipeline(texts[i:i + batch_size], batch_size=batch_size, truncation=True)
+            batch_latencies.append(time.perf_counter() - start)
+            if repeat == 0:
+                labels.extend(result['label'] for result in results)
+
+    print(json.dumps({
+        'backend': backend,
+        'load_seconds': load_seconds,
+        'batch_latencies': batch_latencies,
+        'labels': labels,
+        'rss_after_load_mb': rss_after_load,
+        'peak_rss_mb': peak_rss_mb(),
+    }))
+
+
+def measure_backend(backend, texts_path, batch_size, repeats):
+    output = subprocess.run(
+        [sys.executable, __file__, '--worker', backend, '--texts-json', texts_path,
+         '--batch-size', str(batch_size), '--repeats', str(repeats)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_report(measurements, num_texts, batch_size, repeats):
+    reference = measurements.get('pytorch')
+    print(f"{num_texts} reviews, batch size {batch_size}\n")
+    print(f"{'backend':<12}{'load s':>9}{'p50 ms':>9}{'p95 ms':>9}{'reviews/s':>11}{'peak MB':>10}{'agreement':>11}")
+    for backend, m in measurements.items():
+        latencies = sorted(m['batch_latencies'])
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        throughput = num_texts * repeats / sum(latencies)
+        agreement = 'n/a'
+        if reference is not None:
+            matches = sum(a == b for a, b in zip(m['labels'], reference['labels']))
+            agreement = f"{100.0 * matches / max(1, len(reference['labels'])):.1f}%"
+        peak = f"{m['peak_rss_mb']:.0f}" if m['peak_rss_mb'] is not None else 'n/a'
+        print(f"{backend:<12}{m['load_seconds']:>9.2f}{p50:>9.1f}{p95:>9.1f}{throughput:>11.1f}{peak:>10}{agreement:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sentiment backends on accuracy, latency and memory.")
+    parser.add_argument("--texts-file", help="Reviews to score, one per line (default: recorded fixtures)")
+    parser.add_argument("--limit", type=int, default=200, help="Maximum number of reviews to score")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=3, help="Passes over the reviews for the latency figures")
+    parser.add_argument("--backends", nargs='+', default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--texts-json", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.texts_json, args.batch_size, args.repeats)
+        return
+
+    texts = load_benchmark_texts(args.texts_file, limit=args.limit)
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+        json.dump(texts, f)
+        texts_path = f.name
+    try:
+        measurements = {backend: measure_backend(backend, texts_path, args.batch_size, args.repeats)
+                        for backend in args.backends}
+    finally:
+        os.remove(texts_path)
+    print_report(measurements, len(texts), args.batch_size, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,4 @@
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from geopy.distance import geodesic  # Import geodesic here
 
 
 def load_and_preprocess_data(csv_path="data/tamil_nadu_tourist_place3.csv"):
@@ -14,6 +11,9 @@ def load_and_preprocess_data(csv_path="data/tamil_nadu_tourist_place3.csv"):
     Returns:
         tuple: (X_train, X_test, y_train, y_test, scaler) - Split and preprocessed data, and the fitted scaler.
     """
+    # Only training needs scikit-learn; importing it here keeps the budget page light
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
 
     try:
         df = pd.read_csv(csv_path)
@@ -136,6 +136,8 @@ def calculate_distance(df, from_city, to_city):
     Returns:
         float: The distance in kilometers.
     """
+    from geopy.distance import geodesic  # Imported on first use to keep page loads fast
+
     try:
         coord1 = get_city_coordinates(df, from_city)
         coord2 = get_city_coordinates(df, to_city)
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from data.data_loader import load_original_data, calculate_distance
 from src.price_calculator import PriceCalculator
+from src.city_index import ModeledCityIndex
 
 # Configure page for the budget predictor
 st.set_page_config(page_title="Explorer of INDIA - Budget Predictor", layout="wide")
@@ -37,7 +38,8 @@ def initialize_budget_resources():
     try:
         original_df = load_original_data("data/tamil_nadu_tourist_place3.csv")
         calculator = PriceCalculator(original_df)
-        return original_df, calculator
+        city_index = ModeledCityIndex.from_dataframe(original_df)
+        return original_df, calculator, city_index
     except FileNotFoundError:
         st.error(
             "Budget data file not found. Please ensure 'data/tamil_nadu_tourist_place3.csv' "
@@ -51,7 +53,18 @@ def initialize_budget_resources():
         )
         st.stop()
 
-original_df, calculator = initialize_budget_resources()
+original_df, calculator, city_index = initialize_budget_resources()
+
+
+def nearest_modeled_city(lat, lng):
+    """Returns (city, distance_km) of the modeled city nearest to a point, or (None, None) without coordinates."""
+    if lat is None or lng is None:
+        return None, None
+    return city_index.nearest(lat, lng)[0]
+
+
+def default_index(options, city):
+    return options.index(city) if city in options else 0
 
 def main():
     st.title("Travel Budget Predictor")
@@ -59,6 +72,20 @@ def main():
     if original_df is None or calculator is None:
         return
 
+    # Prefill from the explorer: the trip goes from the user's confirmed location
+    # to the selected place, each mapped to the nearest city the models know
+    location_data = st.session_state.get('location_data') or {}
+    origin_city, _ = nearest_modeled_city(location_data.get('lat'), location_data.get('lon'))
+    selected_place = st.session_state.get('selected_place_details') or {}
+    place_location = selected_place.get('location') or {}
+    destination_city, destination_km = nearest_modeled_city(place_location.get('latitude'), place_location.get('longitude'))
+    if destination_city:
+        place_name = (selected_place.get('displayName') or {}).get('text', 'the selected place')
+        st.info(f"Estimating costs for {place_name} from {destination_city}, the nearest city we have prices for "
+                f"({destination_km:,.0f} km away).")
+
+    city_options = sorted(original_df["city"].unique())
+
     # Initial User Inputs
     budget_tier = st.selectbox("Select Budget Tier", ["budget", "medium", "luxury"])
     num_people = st.number_input("Number of People", min_value=1, max_value=20, value=1)
@@ -77,8 +104,11 @@ def main():
         daily_plan = {"Day": day}
 
         if plan_type == "Explore multiple cities":
-            from_location = st.selectbox(f"Day {day}: From Location", sorted(original_df["city"].unique()))
-            to_location = st.selectbox(f"Day {day}: To Location", sorted([c for c in original_df["city"].unique() if c != from_location]))
+            from_location = st.selectbox(f"Day {day}: From Location", city_options,
+                                         index=default_index(city_options, origin_city))
+            to_options = [c for c in city_options if c != from_location]
+            to_location = st.selectbox(f"Day {day}: To Location", to_options,
+                                       index=default_index(to_options, destination_city))
             season = st.selectbox(f"Day {day}: Season", ["peak", "offpeak"])
             transport_mode = st.selectbox(f"Day {day}: Transportation", ["train", "bus", "flight"])
 
@@ -116,7 +146,8 @@ def main():
                 return
 
         elif plan_type == "Stay & explore local places":
-            location = st.selectbox(f"Day {day}: Location to explore", sorted(original_df["city"].unique()))
+            location = st.selectbox(f"Day {day}: Location to explore", city_options,
+                                    index=default_index(city_options, destination_city))
             try:
                 budget_predictions = calculator.predict_budget(location, "offpeak", budget_tier) # Assuming offpeak and getting local costs
                 if budget_predictions:
@@ -6,6 +6,11 @@ import datetime
 import json
 from collections import Counter
 
+from src.errors import ApiRequestError, ExplorerError, InvalidResponseError
+from src.rate_limiter import RateLimitExceeded, rate_limiter
+from src.single_flight import api_calls
+from src.transport import get_transport
+
 # --- Configuration ---
 st.set_page_config(layout="wide", page_title="Weather Predictor")
 
@@ -37,10 +42,22 @@ weather_api_available = api_keys_available and OPENWEATHER_CURRENT_API_URL and O
 def get_current_weather_data(city_name, units='metric'): # OpenWeatherMap uses 'metric' or 'imperial'
     """
     Fetches current weather data for a given city using OpenWeatherMap API.
+    Concurrent requests for the same city share a single API call.
     """
     if not weather_api_available:
         return None
+    try:
+        return api_calls.do(("owm_current", city_name, units), _fetch_current_weather_data, city_name, units)
+    except RateLimitExceeded as e:
+        st.error(f"Current weather request was not sent ({e}). Please try again shortly.")
+    except ExplorerError as e:
+        # Shown here rather than in the fetcher: every session sharing the call gets the error
+        st.error(str(e))
+    return None
 
+
+def _fetch_current_weather_data(city_name, units):
+    """Raises ExplorerError (including RateLimitExceeded) if the data cannot be fetched."""
     api_url = OPENWEATHER_CURRENT_API_URL
     params = {
         'q': city_name,
@@ -49,21 +66,16 @@ def get_current_weather_data(city_name, units='metric'): # OpenWeatherMap uses '
     }
 
     try:
-        response = requests.get(api_url, params=params)
+        rate_limiter.acquire('openweathermap')
+        response = get_transport().get(api_url, params=params)
         response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
         return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching current weather data from OpenWeatherMap API: {e}")
-        return None
     except json.JSONDecodeError as e:
-        st.error(f"Error decoding JSON response from OpenWeatherMap API: {e}. Raw response might not be JSON.")
-        try:
-            response = requests.get(api_url, params=params)
-            print("Raw Response that failed to decode:")
-            print(response.text)
-        except Exception as inner_e:
-            print(f"Could not re-fetch raw response for debugging: {inner_e}")
-        return None
+        # Checked first: requests' own JSONDecodeError is also a RequestException
+        print(f"Raw OpenWeatherMap response that failed to decode: {response.text}")
+        raise InvalidResponseError("OpenWeatherMap API") from e
+    except requests.exceptions.RequestException as e:
+        raise ApiRequestError("OpenWeatherMap API", e) from e
 
 
 # --- Helper function to fetch forecast weather data from OpenWeatherMap API ---
@@ -72,10 +84,24 @@ def get_forecast_weather_data(city_name, country_code=None, units='metric', days
     Fetches 5-day / 3-hour forecast weather data for a given city using OpenWeatherMap API.
     Note: OpenWeatherMap's free API provides 5-day / 3-hour forecast, not daily summary directly.
     We will process it to show daily summaries.
+    Concurrent requests for the same city share a single API call.
     """
     if not weather_api_available:
         return None
-
+    try:
+        return api_calls.do(
+            ("owm_forecast", city_name, country_code, units, days),
+            _fetch_forecast_weather_data, city_name, country_code, units, days
+        )
+    except RateLimitExceeded as e:
+        st.error(f"Forecast request was not sent ({e}). Please try again shortly.")
+    except ExplorerError as e:
+        st.error(str(e))
+    return None
+
+
+def _fetch_forecast_weather_data(city_name, country_code, units, days):
+    """Raises ExplorerError (including RateLimitExceeded) if the data cannot be fetched."""
     api_url = OPENWEATHER_FORECAST_API_URL
     
     # Construct the 'q' parameter with city name and optional country code
@@ -92,21 +118,16 @@ def get_forecast_weather_data(city_name, country_code=None, units='metric', days
     }
 
     try:
-        response = requests.get(api_url, params=params)
+        rate_limiter.acquire('openweathermap')
+        response = get_transport().get(api_url, params=params)
         response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
         return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching forecast weather data from OpenWeatherMap API: {e}")
-        return None
     except json.JSONDecodeError as e:
-        st.error(f"Error decoding JSON response from OpenWeatherMap API: {e}. Raw response might not be JSON.")
-        try:
-            response = requests.get(api_url, params=params)
-            print("Raw Response that failed to decode:")
-            print(response.text)
-        except Exception as inner_e:
-            print(f"Could not re-fetch raw response for debugging: {inner_e}")
-        return None
+        # Checked first: requests' own JSONDecodeError is also a RequestException
+        print(f"Raw OpenWeatherMap response that failed to decode: {response.text}")
+        raise InvalidResponseError("OpenWeatherMap API") from e
+    except requests.exceptions.RequestException as e:
+        raise ApiRequestError("OpenWeatherMap API", e) from e
 
 
 # --- Custom CSS (Optional: for consistent styling with app.py) ---
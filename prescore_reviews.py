@@ -0,0 +1,109 @@
+"""
+Pre-scores review sentiment for the places of a city (or a list of place IDs),
+so the details page can show stored aggregates instead of running the model
+while a user waits. Run it e.g. nightly for the popular cities:
+
+    python prescore_reviews.py --city Madurai --city Chennai --workers 4
+    python prescore_reviews.py --place-ids ChIJ... ChIJ...
+
+Place details go through the usual Places functions (cache, rate limits, quota);
+reviews are scored in batches by a pool of worker processes.
+"""
+
+import argparse
+import os
+import time
+
+from src.errors import ExplorerError
+from src.explorer_utils import google_places_details_new, iter_places_text_search_pages
+from src.location_detection import get_coordinates
+from src.place_catalogue import LOCAL_SEARCH_RADIUS_M, load_dataset_cities
+from src.sentiment_model import SENTIMENT_BACKEND, SENTIMENT_BATCH_SIZE, get_reviews_sentiment_for_places
+from src.sentiment_pool import SentimentWorkerPool
+from src.sentiment_store import save_place_sentiment
+
+GOOGLE_PLACES_BASE_URL = "https://places.googleapis.com/v1/"
+CITY_QUERY = "tourist attractions in {city}"
+
+
+def city_place_ids(city, api_key, max_places):
+    """Returns the IDs of the top attractions of a city, as the app's search would list them."""
+    coordinates = {c['displayName']['text'].lower(): c['location'] for c in load_dataset_cities()}
+    location = coordinates.get(city.lower())
+    if location is None:
+        lat, lng = get_coordinates(city)
+        location = {'latitude': lat, 'longitude': lng} if lat is not None else None
+    location_bias = {'circle': {'center': location, 'radius': LOCAL_SEARCH_RADIUS_M}} if location else None
+
+    place_ids = []
+    for page in iter_places_text_search_pages(
+        CITY_QUERY.format(city=city), location_bias=location_bias,
+        api_base_url=GOOGLE_PLACES_BASE_URL, api_key=api_key, max_results=max_places
+    ):
+        place_ids.extend(place['id'] for place in page)
+    return place_ids
+
+
+def fetch_reviews(place_ids, api_key):
+    """Returns {place_id: reviews} for the places whose details could be fetched."""
+    reviews_by_place = {}
+    for place_id in place_ids:
+        try:
+            details = google_places_details_new(place_id, GOOGLE_PLACES_BASE_URL, api_key, tier='heavy')
+        except ExplorerError as e:
+            print(f"  Skipping {place_id}: {e}")
+            continue
+        reviews_by_place[place_id] = details.get('reviews', [])
+    return reviews_by_place
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-score review sentiment for places and store the aggregates.")
+    parser.add_argument("--city", action='append', default=[], help="City whose top attractions to score (repeatable)")
+    parser.add_argument("--place-ids", nargs='+', default=[], help="Place IDs to score")
+    parser.add_argument("--max-places", type=int, default=60, help="Places per city")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="Scoring processes")
+    parser.add_argument("--batch-size", type=int, default=SENTIMENT_BATCH_SIZE)
+    parser.add_argument("--backend", default=SENTIMENT_BACKEND, choices=['pytorch', 'onnx-int8'])
+    parser.add_argument("--api-key", default=os.environ.get("GOOGLE_CLOUD_API_KEY"),
+                        help="Google Cloud API key (default: $GOOGLE_CLOUD_API_KEY)")
+    args = parser.parse_args()
+
+    if not args.city and not args.place_ids:
+        parser.error("give at least one --city or --place-ids")
+    if not args.api_key:
+        parser.error("a Google Cloud API key is required (--api-key or $GOOGLE_CLOUD_API_KEY)")
+
+    start = time.perf_counter()
+    place_ids = list(args.place_ids)
+    for city in args.city:
+        try:
+            city_ids = city_place_ids(city, args.api_key, args.max_places)
+        except ExplorerError as e:
+            print(f"Could not list places for {city}: {e}")
+            continue
+        print(f"{city}: {len(city_ids)} places")
+        place_ids.extend(city_ids)
+    place_ids = list(dict.fromkeys(place_ids))
+
+    print(f"Fetching details for {len(place_ids)} places...")
+    reviews_by_place = fetch_reviews(place_ids, args.api_key)
+    num_reviews = sum(len(reviews) for reviews in reviews_by_place.values())
+
+    print(f"Scoring {num_reviews} reviews with {args.workers} workers...")
+    pool = SentimentWorkerPool(args.workers, args.backend).warm_up()
+    try:
+        summaries = get_reviews_sentiment_for_places(pool, reviews_by_place, batch_size=args.batch_size)
+    finally:
+        pool.close()
+
+    stored = 0
+    for place_id, summary in summaries.items():
+        if summary and summary['total_analyzed']:
+            save_place_sentiment(place_id, summary)
+            stored += 1
+    print(f"Stored sentiment for {stored} places in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Profiles the cold import time of each entry point and checks it against a budget.
+
+Runs the entry point's top-level imports in a fresh interpreter with
+`python -X importtime`, drops what the bare interpreter imports anyway, and
+aggregates the rest per top-level package:
+
+    python profile_imports.py                 # report for every entry point
+    python profile_imports.py --check         # also exit 1 if a budget is exceeded (for CI)
+    python profile_imports.py app.py --top 30
+
+Heavy packages (transformers, torch, sklearn, folium, geopy...) should not appear
+here: they are imported on the code path that needs them.
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = ['app.py', 'pages/budget_predictor.py', 'pages/weather_predictor.py']
+# Milliseconds of cold import allowed per entry point; EXPLORER_IMPORT_BUDGET_MS overrides the app's
+IMPORT_BUDGETS_MS = {
+    'app.py': float(os.environ.get("EXPLORER_IMPORT_BUDGET_MS", "1500")),
+}
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def entry_point_imports(path):
+    """Returns the source of the module-level import statements of a script."""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    statements = []
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statements.append(ast.get_source_segment(source, node))
+    return "\n".join(statements)
+
+
+def run_importtime(code):
+    """
+    Runs code in a fresh interpreter with -X importtime.
+    Returns ({module: (self_us, cumulative_us)}, wall-clock seconds).
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else "import failed")
+
+    modules = {}
+    for line in completed.stderr.splitlines():
+        # import time:       self [us] |  cumulative | imported package
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return modules, elapsed
+
+
+def profile_entry_point(path, baseline_modules):
+    """
+    Returns (total_ms, {top-level package: ms}, wall-clock seconds) for the imports of path,
+    not counting modules the bare interpreter imports anyway.
+    """
+    modules, elapsed = run_importtime(entry_point_imports(path))
+    per_package = {}
+    for name, (self_us, _) in modules.items():
+        if name in baseline_modules:
+            continue
+        package = name.split('.')[0]
+        per_package[package] = per_package.get(package, 0.0) + self_us / 1000.0
+    return sum(per_package.values()), per_package, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregated import-time profile of the app's entry points.")
+    parser.add_argument("entry_points", nargs='*', default=ENTRY_POINTS)
+    parser.add_argument("--top", type=int, default=15, help="Packages listed per entry point")
+    parser.add_argument("--check", action='store_true', help="Exit with status 1 if an entry point exceeds its budget")
+    parser.add_argument("--budget-ms", type=float, help="Budget for every selected entry point (overrides the defaults)")
+    args = parser.parse_args()
+
+    baseline_modules, _ = run_importtime("pass")
+    over_budget = []
+    for path in args.entry_points:
+        total_ms, per_package, elapsed = profile_entry_point(path, baseline_modules)
+        budget_ms = args.budget_ms if args.budget_ms is not None else IMPORT_BUDGETS_MS.get(path)
+
+        print(f"\n{path}: {total_ms:.0f} ms of imports ({elapsed:.2f}s wall clock)"
+              + (f", budget {budget_ms:.0f} ms" if budget_ms is not None else ""))
+        for package, ms in sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f"  {package:<28}{ms:>9.1f} ms {100.0 * ms / total_ms if total_ms else 0:>6.1f}%")
+        if budget_ms is not None and total_ms > budget_ms:
+            over_budget.append(path)
+            print(f"  OVER BUDGET by {total_ms - budget_ms:.0f} ms")
+
+    if args.check and over_budget:
+        print(f"\nImport-time budget exceeded: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import threading
+
+import numpy as np
+
+from data.data_loader import load_original_data
+
+# --- Modeled City Index Configuration ---
+DATASET_PATH = "data/tamil_nadu_tourist_place3.csv"
+EARTH_RADIUS_KM = 6371.0
+
+
+class ModeledCityIndex:
+    """
+    Maps coordinates to the nearest cities the budget models know, using a
+    haversine BallTree over the dataset's city coordinates. Lookups are batched:
+    nearest_batch() answers a whole array of points in one vectorised query.
+    """
+
+    def __init__(self, cities, latitudes, longitudes):
+        """
+        Args:
+            cities (list): City names, as in the dataset's 'city' column.
+            latitudes (array-like): Latitude of each city, in degrees.
+            longitudes (array-like): Longitude of each city, in degrees.
+        """
+        # sklearn is imported on first use: it adds seconds to a cold page load
+        from sklearn.neighbors import BallTree
+
+        self.cities = np.asarray(cities, dtype=object)
+        points = np.radians(np.column_stack([latitudes, longitudes]).astype(float))
+        self._tree = BallTree(points, metric='haversine')
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Builds the index from a DataFrame with 'city', 'lat' and 'lng' columns (one row per city is used)."""
+        cities = df.dropna(subset=['city', 'lat', 'lng']).drop_duplicates('city')
+        return cls(cities['city'].tolist(), cities['lat'].to_numpy(), cities['lng'].to_numpy())
+
+    def __len__(self):
+        return len(self.cities)
+
+    def nearest_batch(self, latitudes, longitudes, k=1):
+        """
+        Finds the k nearest modeled cities of many points at once.
+
+        Args:
+            latitudes (array-like): Latitudes of the points, in degrees.
+            longitudes (array-like): Longitudes of the points, in degrees.
+            k (int, optional): Number of cities per point.
+
+        Returns:
+            tuple: (cities, distances_km), two arrays of shape (n_points, k), nearest first.
+        """
+        k = min(k, len(self.cities))
+        points = np.radians(np.column_stack([np.atleast_1d(latitudes), np.atleast_1d(longitudes)]).astype(float))
+        distances, indices = self._tree.query(points, k=k)
+        return self.cities[indices], distances * EARTH_RADIUS_KM
+
+    def nearest(self, lat, lng, k=1):
+        """Returns [(city, distance_km), ...] for the k modeled cities nearest to one point, nearest first."""
+        cities, distances = self.nearest_batch([lat], [lng], k=k)
+        return [(city, float(distance)) for city, distance in zip(cities[0], distances[0])]
+
+    def nearest_to_place(self, place, k=1):
+        """
+        Like nearest(), for a Places result or details dict with a 'location'.
+        Returns an empty list if the place has no coordinates.
+        """
+        location = (place or {}).get('location') or {}
+        if location.get('latitude') is None or location.get('longitude') is None:
+            return []
+        return self.nearest(location['latitude'], location['longitude'], k=k)
+
+
+_city_index = None
+_city_index_lock = threading.Lock()
+
+
+def get_city_index():
+    """Returns the process-wide index of modeled cities, built from the budget dataset on first use."""
+    global _city_index
+    with _city_index_lock:
+        if _city_index is None:
+            _city_index = ModeledCityIndex.from_dataframe(load_original_data(DATASET_PATH))
+        return _city_index
@@ -0,0 +1,33 @@
+class ExplorerError(Exception):
+    """
+    Base class for errors raised by the core (non-UI) modules.
+    str(error) is a message suitable for showing to the user; the UI layer decides how.
+    """
+
+
+class MissingCredentialsError(ExplorerError):
+    """Raised when an API key or base URL needed for a request is not configured."""
+
+    def __init__(self, service):
+        super().__init__(f"API key or base URL is missing for {service}.")
+        self.service = service
+
+
+class ApiRequestError(ExplorerError):
+    """Raised when a request to an external API fails (network error or error status)."""
+
+    def __init__(self, service, detail):
+        super().__init__(f"Error calling {service}: {detail}")
+        self.service = service
+        self.detail = detail
+
+
+class InvalidResponseError(ApiRequestError):
+    """Raised when an external API answers with something that is not valid JSON."""
+
+    def __init__(self, service):
+        super().__init__(service, "invalid JSON response")
+
+
+class ServiceBusyError(ExplorerError):
+    """Raised when a local service (e.g. the sentiment worker pool) is saturated or too slow to answer."""
@@ -1,32 +1,236 @@
-import streamlit as st
 import requests
 import json
+import math
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.disk_cache import CACHE_DIR, DiskCache
+from src.errors import ApiRequestError, ExplorerError, InvalidResponseError, MissingCredentialsError
+from src.known_places import get_known_places
+from src.photo_store import get_photo_store
+from src.rate_limiter import PREFETCH, RateLimitExceeded, rate_limiter
+from src.single_flight import api_calls
+from src.transport import get_transport
+
+# --- Places Response Cache ---
+# Search results and place details are cached on disk so that repeated queries
+# (explore buttons, nearby attractions, "Back" navigation) skip the API entirely.
+PLACES_CACHE_PATH = os.path.join(CACHE_DIR, "places_cache.sqlite")
+PLACES_CACHE_MAX_BYTES = 100 * 1024 * 1024
+TEXT_SEARCH_CACHE_TTL = 6 * 60 * 60       # 6 hours
+PLACE_DETAILS_CACHE_TTL = 24 * 60 * 60    # 24 hours
+LOCATION_CELL_DEGREES = 0.01              # ~1.1 km grid cell for location bias keys
+
+# --- Text Search Pagination ---
+TEXT_SEARCH_PAGE_SIZE = 20       # Maximum page size allowed by the API
+TEXT_SEARCH_MAX_RESULTS = 60     # The API stops paginating after 60 results
+PAGE_TOKEN_MAX_AGE = 60          # Seconds a nextPageToken is trusted; cached pages can be hours old
+# Next result pages fetched in the background at once, shared by all sessions
+SEARCH_PAGE_PREFETCH_WORKERS = max(1, int(os.environ.get("EXPLORER_SEARCH_PAGE_WORKERS", "4")))
+
+# --- Nearby Attractions ---
+NEARBY_ATTRACTIONS_TAG = 'attractions'
+NEARBY_ATTRACTIONS_RADIUS_M = 5000
+NEARBY_ATTRACTIONS_MIN_LOCAL = 5   # Fewer known attractions than this counts as sparse coverage
+
+# Shared by all sessions for fetching the next result page in the background
+_search_page_executor = ThreadPoolExecutor(max_workers=SEARCH_PAGE_PREFETCH_WORKERS, thread_name_prefix="search-page")
+
+places_cache = DiskCache(PLACES_CACHE_PATH, max_bytes=PLACES_CACHE_MAX_BYTES)
+
+# --- Place Details Field Tiers ---
+# The light tier is enough to render the header, info column and map; the heavy
+# tier holds the large fields and is loaded only when its sections are rendered.
+PLACE_DETAILS_LIGHT_FIELDS = [
+    'id', 'displayName', 'formattedAddress', 'location', 'types', 'rating',
+    'userRatingCount', 'websiteUri', 'internationalPhoneNumber', 'priceLevel'
+]
+PLACE_DETAILS_HEAVY_FIELDS = [
+    'id', 'regularOpeningHours', 'accessibilityOptions', 'photos', 'reviews'
+]
+PLACE_DETAILS_FIELD_TIERS = {
+    'light': PLACE_DETAILS_LIGHT_FIELDS,
+    'heavy': PLACE_DETAILS_HEAVY_FIELDS,
+    'full': PLACE_DETAILS_LIGHT_FIELDS + PLACE_DETAILS_HEAVY_FIELDS[1:],
+}
+
+
+def _normalize_query(query):
+    """Lower-cases the query and collapses whitespace so trivial variants share a cache entry."""
+    return " ".join(str(query).lower().split())
+
+
+def _location_cell(area):
+    """
+    Quantizes a locationBias/locationRestriction dict to a coarse grid cell so that
+    nearby user locations share cached results.
+    Returns None when no area is given.
+    """
+    if not area:
+        return None
+    circle = area.get('circle')
+    if circle:
+        center = circle.get('center', {})
+        return [
+            math.floor(center.get('latitude', 0) / LOCATION_CELL_DEGREES),
+            math.floor(center.get('longitude', 0) / LOCATION_CELL_DEGREES),
+            circle.get('radius'),
+        ]
+    # Rectangles and other shapes are uncommon here; key on their exact value.
+    return json.dumps(area, sort_keys=True)
+
+
+def _text_search_cache_key(query, location_bias, location_restriction, page_index=0, page_size=None):
+    return "search:" + json.dumps(
+        [_normalize_query(query), _location_cell(location_bias), _location_cell(location_restriction),
+         page_index, page_size]
+    )
+
+
+def _details_cache_key(place_id):
+    # One record per place; the record itself tracks which fields have been loaded.
+    return "details:" + place_id
+
 
 # --- Google Places API Functions ---
 
-def google_places_text_search_new(query, location_bias=None, location_restriction=None, api_base_url=None, api_key=None):
+def google_places_text_search_new(query, location_bias=None, location_restriction=None, api_base_url=None, api_key=None, use_cache=True):
     """
     Performs a text search using the NEW Google Places API (places.googleapis.com/v1/places:searchText).
+    Only the first page of results is returned; use iter_places_text_search_pages for more.
+    Results are served from the on-disk places cache when available.
     Args:
         query (str): The text string on which to search.
         location_bias (dict, optional): Location biasing preferences.
         location_restriction (dict, optional): Location restriction preferences.
         api_base_url (str): The base URL for the Google Places API.
         api_key (str): Your Google Cloud API key.
+        use_cache (bool, optional): Read from and write to the places cache. Defaults to True.
     Returns:
-        list: A list of place dictionaries from the API response, or None on error.
+        list: A list of place dictionaries from the API response.
+    Raises:
+        ExplorerError: If the credentials are missing or the request fails.
     """
     if not api_base_url or not api_key:
-        st.error("API key or base URL is missing for Google Places Text Search.")
-        return None
+        raise MissingCredentialsError("Google Places Text Search")
+
+    page = _text_search_page(query, location_bias, location_restriction, api_base_url, api_key, use_cache=use_cache)
+    return page.get('places', [])
+
+
+def iter_places_text_search_pages(query, location_bias=None, location_restriction=None, api_base_url=None, api_key=None,
+                                  max_results=TEXT_SEARCH_MAX_RESULTS, page_size=TEXT_SEARCH_PAGE_SIZE,
+                                  prefetch_next=True, use_cache=True):
+    """
+    Streams text search results page by page, following nextPageToken.
+    Places already yielded on an earlier page (same place ID) are skipped.
+    Args:
+        query (str): The text string on which to search.
+        location_bias (dict, optional): Location biasing preferences.
+        location_restriction (dict, optional): Location restriction preferences.
+        api_base_url (str): The base URL for the Google Places API.
+        api_key (str): Your Google Cloud API key.
+        max_results (int, optional): Stop once this many places have been yielded in total.
+        page_size (int, optional): Number of places requested per page (the API allows up to 20).
+        prefetch_next (bool, optional): Request the next page in the background while the
+                                        caller is still handling the current one.
+        use_cache (bool, optional): Read from and write to the places cache. Defaults to True.
+    Yields:
+        list: The new place dictionaries of each page.
+    Raises:
+        ExplorerError: If the credentials are missing or a page cannot be fetched; pages
+                       yielded before the error remain valid.
+    """
+    if not api_base_url or not api_key:
+        raise MissingCredentialsError("Google Places Text Search")
+
+    def fetch_page(page_index, page_token, refresh=False):
+        return _text_search_page(
+            query, location_bias, location_restriction, api_base_url, api_key,
+            page_index=page_index, page_token=page_token, page_size=page_size, use_cache=use_cache,
+            refresh=refresh
+        )
+
+    def replay_uncached(page_index):
+        # Follows the search from the first page again with fresh tokens (and refreshes the cache)
+        page_token = None
+        for index in range(page_index + 1):
+            replayed = fetch_page(index, page_token, refresh=True)
+            page_token = replayed.get('nextPageToken')
+            if index < page_index and not page_token:
+                return {'places': []}  # The results got shorter meanwhile
+        return replayed
+
+    seen_ids = set()
+    total_yielded = 0
+    page_index = 0
+    page_future = None
+    page = fetch_page(0, None)
+
+    while True:
+        new_places = []
+        for place in page.get('places', []):
+            place_id = place.get('id')
+            if place_id in seen_ids:
+                continue
+            seen_ids.add(place_id)
+            new_places.append(place)
+        new_places = new_places[:max_results - total_yielded]
+        total_yielded += len(new_places)
+
+        next_page_token = page.get('nextPageToken')
+        has_more = bool(next_page_token) and total_yielded < max_results
+        if has_more and prefetch_next:
+            page_future = _search_page_executor.submit(
+                rate_limiter.run_with_priority, PREFETCH, fetch_page, page_index + 1, next_page_token
+            )
+
+        if new_places:
+            yield new_places
+        if not has_more:
+            return
+
+        # A page served from the cache may carry a token that has long expired
+        token_may_be_expired = time.time() - page.get('cachedAt', time.time()) > PAGE_TOKEN_MAX_AGE
+        page_index += 1
+        prefetched, page_future = page_future, None
+        try:
+            if prefetched is not None:
+                try:
+                    page = prefetched.result()
+                except RateLimitExceeded:
+                    # The prefetch lane fails fast when tokens are short; the caller's own lane may wait
+                    page = fetch_page(page_index, next_page_token)
+            else:
+                page = fetch_page(page_index, next_page_token)
+        except ApiRequestError:
+            if not token_may_be_expired:
+                raise
+            page = replay_uncached(page_index)
+
+
+def _text_search_page(query, location_bias, location_restriction, api_base_url, api_key,
+                      page_index=0, page_token=None, page_size=None, use_cache=True, refresh=False):
+    """
+    Fetches one page of text search results.
+    Returns the raw response dict ('places' and optionally 'nextPageToken'); pages
+    read from the cache also carry 'cachedAt', the time they were fetched.
+    With refresh=True the request is sent even if the page is cached.
+    """
+    # Page tokens are opaque and short-lived, so pages are cached by their position instead
+    cache_key = _text_search_cache_key(query, location_bias, location_restriction, page_index, page_size)
+    if use_cache and not refresh:
+        cached_page = places_cache.get(cache_key)
+        if cached_page is not None:
+            return cached_page
 
     url = api_base_url + "places:searchText"
 
     field_mask = [
         'places.id', 'places.displayName', 'places.formattedAddress',
         'places.location', 'places.types', 'places.rating', 'places.userRatingCount',
-        'places.priceLevel'
+        'places.priceLevel', 'nextPageToken'
     ]
 
     headers = {
@@ -43,60 +247,144 @@ def google_places_text_search_new(query, location_bias=None, location_restrictio
         data['locationBias'] = location_bias
     if location_restriction:
         data['location_restriction'] = location_restriction
+    if page_size:
+        data['pageSize'] = page_size
+    if page_token:
+        data['pageToken'] = page_token
+
+    # Identical searches running concurrently (e.g. popular-place buttons) share one request
+    return api_calls.do(
+        ("places_text_search", cache_key, page_token),
+        _request_text_search, url, headers, data, cache_key if use_cache else None
+    )
+
 
+def _request_text_search(url, headers, data, cache_key=None):
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        rate_limiter.acquire('google_places')
+        response = get_transport().post(url, headers=headers, data=json.dumps(data))
         response.raise_for_status()
         response_data = response.json()
-        return response_data.get('places', [])
+        page = {'places': response_data.get('places', [])}
+        if response_data.get('nextPageToken'):
+            page['nextPageToken'] = response_data['nextPageToken']
+        if cache_key:
+            places_cache.set(cache_key, {**page, 'cachedAt': time.time()}, ttl=TEXT_SEARCH_CACHE_TTL)
+        # Remember every place we see so nearby queries can be answered locally
+        get_known_places().add_places(page['places'])
+        return page
     except requests.exceptions.RequestException as e:
-        st.error(f"Error calling New Places Text Search API: {e}")
-        return None
-    except json.JSONDecodeError:
-        st.error("Invalid JSON response from New Places Text Search API.")
-        return None
+        raise ApiRequestError("New Places Text Search API", e) from e
+    except json.JSONDecodeError as e:
+        raise InvalidResponseError("New Places Text Search API") from e
 
 
-def google_places_details_new(place_id, api_base_url=None, api_key=None):
+def google_places_details_new(place_id, api_base_url=None, api_key=None, use_cache=True, tier='full'):
     """
     Fetches detailed information for a place using its Place ID
     from the NEW Google Places API (places.googleapis.com/v1/places/{place_id}).
+    Only the fields of the requested tier are fetched. Tiers loaded at different
+    times are merged into a single cached record for the place, so fields that
+    are already cached are never requested again.
     Args:
         place_id (str): The unique identifier of the place.
         api_base_url (str): The base URL for the Google Places API.
         api_key (str): Your Google Cloud API key.
+        use_cache (bool, optional): Read from and write to the places cache. Defaults to True.
+        tier (str, optional): 'light' (header and contact info), 'heavy' (hours, accessibility,
+                              photos, reviews) or 'full' (both). Defaults to 'full'.
     Returns:
-        dict: A dictionary containing place details, or None on error/not found.
+        dict: A dictionary containing place details.
+    Raises:
+        ExplorerError: If the credentials are missing or the request fails.
     """
     if not api_base_url or not api_key:
-        st.error("API key or base URL is missing for Google Places Details.")
-        return None
+        raise MissingCredentialsError("Google Places Details")
 
-    url = api_base_url + f"places/{place_id}"
+    field_mask = PLACE_DETAILS_FIELD_TIERS[tier]
 
-    field_mask = [
-        'id', 'displayName', 'formattedAddress', 'location', 'types', 'rating',
-        'userRatingCount', 'regularOpeningHours', 'websiteUri', 'internationalPhoneNumber',
-        'photos', 'reviews', 'priceLevel', 'accessibilityOptions'
-    ]
+    loaded_fields = []
+    if use_cache:
+        record = places_cache.get(_details_cache_key(place_id))
+        if record:
+            loaded_fields = record['fields']
+            if set(field_mask) <= set(loaded_fields):
+                return record['place']
+
+    # Ask only for what the cached record is missing ('id' is always included)
+    missing_fields = ['id'] + [f for f in field_mask if f != 'id' and f not in loaded_fields]
+
+    url = api_base_url + f"places/{place_id}"
 
     headers = {
         'Content-Type': 'application/json',
         'X-Goog-Api-Key': api_key,
-        'X-Goog-FieldMask': ','.join(field_mask)
+        'X-Goog-FieldMask': ','.join(missing_fields)
     }
 
+    return api_calls.do(
+        ("places_details", place_id, ','.join(missing_fields)),
+        _request_place_details, url, headers, place_id, missing_fields, use_cache
+    )
+
+
+def _request_place_details(url, headers, place_id, field_mask, use_cache=True):
     try:
-        response = requests.get(url, headers=headers)
+        rate_limiter.acquire('google_places')
+        response = get_transport().get(url, headers=headers)
         response.raise_for_status()
         place_details = response.json()
+        if use_cache:
+            place_details = _merge_cached_place_record(place_id, field_mask, place_details)
         return place_details
     except requests.exceptions.RequestException as e:
-        st.error(f"Error calling New Places Details API for {place_id}: {e}")
-        return None
-    except json.JSONDecodeError:
-        st.error("Invalid JSON response from New Places Details API.")
-        return None
+        raise ApiRequestError(f"New Places Details API for {place_id}", e) from e
+    except json.JSONDecodeError as e:
+        raise InvalidResponseError("New Places Details API") from e
+
+
+def _merge_cached_place_record(place_id, field_mask, place_details):
+    """
+    Merges freshly fetched fields into the cached record for a place and
+    returns the combined place dictionary.
+    """
+    cache_key = _details_cache_key(place_id)
+    record = places_cache.get(cache_key) or {'fields': [], 'place': {}}
+    merged_place = merge_place_details(record['place'], place_details)
+    merged_fields = sorted(set(record['fields']) | set(field_mask))
+    places_cache.set(cache_key, {'fields': merged_fields, 'place': merged_place}, ttl=PLACE_DETAILS_CACHE_TTL)
+    return merged_place
+
+
+def merge_place_details(base_details, extra_details):
+    """
+    Combines two partial place dictionaries (e.g. the light and heavy tiers).
+    Fields in extra_details take precedence. Neither input is modified.
+    """
+    merged = dict(base_details or {})
+    merged.update(extra_details or {})
+    return merged
+
+
+def load_place_detail_tier(place_details, tier, api_base_url=None, api_key=None):
+    """
+    Makes sure the fields of a tier are present in an already loaded place.
+    Args:
+        place_details (dict): The place as currently displayed (must contain 'id').
+        tier (str): The tier whose fields are needed, e.g. 'heavy'.
+        api_base_url (str): The base URL for the Google Places API.
+        api_key (str): Your Google Cloud API key.
+    Returns:
+        dict: place_details merged with the tier's fields.
+    Raises:
+        ExplorerError: If the missing fields cannot be fetched.
+    """
+    missing_fields = [f for f in PLACE_DETAILS_FIELD_TIERS[tier] if f not in place_details]
+    if not missing_fields:
+        return place_details
+    tier_details = google_places_details_new(place_details['id'], api_base_url, api_key, tier=tier)
+    # Fields the place legitimately lacks (e.g. no reviews) are answered from the cached record
+    return merge_place_details(place_details, tier_details)
 
 
 def fetch_place_photos(photo_name, api_key, maxwidth=400):
@@ -116,77 +404,61 @@ def fetch_place_photos(photo_name, api_key, maxwidth=400):
     return url
 
 
-def get_place_reviews_with_sentiment(sentiment_pipeline, place_details_reviews):
+def fetch_place_photo_image(photo_name, api_key, maxwidth=400):
     """
-    Analyzes the sentiment of a list of reviews using the ML model
-    and provides an aggregated summary, including individual results.
+    Fetches a place photo through the local photo store. Each photo is downloaded
+    once and served from disk afterwards, so the API key is never sent to the browser.
     Args:
-        sentiment_pipeline: The loaded sentiment analysis pipeline.
-        place_details_reviews (list): A list of review dictionaries from the Google Places API.
-                                      Each dict is expected to have a 'text' key.
+        photo_name (str): The 'name' field from a photo object in Places API response.
+        api_key (str): Your Google Cloud API key.
+        maxwidth (int, optional): Desired width of the photo. Defaults to 400.
     Returns:
-        dict: A dictionary containing the aggregated sentiment counts
-              (positive, negative, total analyzed) and an overall category.
-              Includes 'individual_results' for each review's sentiment.
-              Returns None if no valid reviews are provided.
+        bytes: The JPEG image, or None if not available.
+    Raises:
+        RateLimitExceeded: If the photo must be downloaded but the request cannot be sent.
     """
-    if not place_details_reviews:
-        return None
-
-    positive_count = 0
-    negative_count = 0
-    total_analyzed = 0
-    individual_results = []
-
-    for review in place_details_reviews:
-        review_text = review.get('text', '')
-        if review_text:
-            try:
-                sentiment = sentiment_pipeline(review_text)[0] # Pipeline returns list of dicts
-                individual_results.append({'review': review_text, 'sentiment': sentiment})
-                total_analyzed += 1
-                if sentiment['label'] == 'POSITIVE':
-                    positive_count += 1
-                elif sentiment['label'] == 'NEGATIVE':
-                    negative_count += 1
-            except Exception as e:
-                st.warning(f"Could not analyze sentiment for a review: {e}")
-
-    overall_category = "Neutral 😐"
-    if total_analyzed > 0:
-        if positive_count > negative_count * 1.5:
-            overall_category = "Mostly Positive 😊"
-        elif negative_count > positive_count * 1.5:
-            overall_category = "Mostly Negative 😞"
-        elif positive_count > 0 or negative_count > 0:
-            overall_category = "Mixed Feelings 😐"
-
-    return {
-        'positive_count': positive_count,
-        'negative_count': negative_count,
-        'neutral_count': total_analyzed - positive_count - negative_count,
-        'total_analyzed': total_analyzed,
-        'overall_category': overall_category,
-        'individual_results': individual_results
-    }
+    return get_photo_store().get_photo(photo_name, api_key, width=maxwidth)
 
 
 def find_nearby_attractions(lat, lng, api_base_url, api_key):
     """
-    Finds nearby tourist attractions using the Google Places Text Search API.
+    Finds nearby tourist attractions. Answers from the local index of known places
+    when a recent API search already covered this area with enough results, and
+    falls back to the Google Places Text Search API otherwise.
     Args:
         lat (float): Latitude of the center point.
         lng (float): Longitude of the center point.
         api_base_url (str): The base URL for the Google Places API.
         api_key (str): Your Google Cloud API key.
     Returns:
-        list: A list of nearby attraction dictionaries, or None on error.
+        list: A list of nearby attraction dictionaries.
+    Raises:
+        ExplorerError: If the API fails and nothing is known locally about the area.
     """
+    known_places = get_known_places()
+    if known_places.is_covered(NEARBY_ATTRACTIONS_TAG, lat, lng, NEARBY_ATTRACTIONS_RADIUS_M):
+        local_attractions = known_places.within_radius(
+            lat, lng, NEARBY_ATTRACTIONS_RADIUS_M, tag=NEARBY_ATTRACTIONS_TAG
+        )
+        if len(local_attractions) >= NEARBY_ATTRACTIONS_MIN_LOCAL:
+            return local_attractions
+
     query = "tourist attraction"
     location_bias = {
         'circle': {
             'center': {'latitude': lat, 'longitude': lng},
-            'radius': 5000 # Search within 5km radius for nearby attractions
+            'radius': NEARBY_ATTRACTIONS_RADIUS_M # Search within 5km radius for nearby attractions
         }
     }
-    return google_places_text_search_new(query, location_bias=location_bias, api_base_url=api_base_url, api_key=api_key)
\ No newline at end of file
+    try:
+        attractions = google_places_text_search_new(query, location_bias=location_bias, api_base_url=api_base_url, api_key=api_key)
+    except ExplorerError:
+        # API unavailable: whatever we know locally is better than nothing
+        local_attractions = known_places.within_radius(lat, lng, NEARBY_ATTRACTIONS_RADIUS_M, tag=NEARBY_ATTRACTIONS_TAG)
+        if local_attractions:
+            return local_attractions
+        raise
+
+    known_places.add_places(attractions, tag=NEARBY_ATTRACTIONS_TAG)
+    known_places.mark_covered(NEARBY_ATTRACTIONS_TAG, lat, lng, NEARBY_ATTRACTIONS_RADIUS_M)
+    return attractions
@@ -0,0 +1,353 @@
+import bisect
+import csv
+import difflib
+import heapq
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from src.disk_cache import CACHE_DIR
+from src.known_places import get_known_places
+from src.place_catalogue import DATASET_PATH, load_dataset_cities
+
+# --- Gazetteer Configuration ---
+GAZETTEER_EXTRA_PATH = "data/place_names.csv"  # Optional bundled names: name,lat,lng,label
+GAZETTEER_USAGE_PATH = os.path.join(CACHE_DIR, "gazetteer_usage.json")  # Geocoded names and pick counts
+FUZZY_MATCH_CUTOFF = 0.85                       # difflib similarity a misspelt name must reach
+FUZZY_MIN_LENGTH = 4                            # Shorter queries only match exactly
+COUNTRY_WORDS = {'india'}                       # Accepted after a comma for any entry
+SUGGEST_MIN_PREFIX = 2                          # Single letters match too much to be useful
+SUGGEST_LIMIT = 6
+GEOCODED_SUGGEST_MIN_USES = 2                   # Names typed by users are suggested to others only once picked again
+INDEX_REBUILD_INTERVAL = 5.0                    # Seconds between background rebuilds of the suggestion index
+
+# When several entries share a name, the lowest source rank wins
+SOURCE_BUNDLED, SOURCE_DATASET, SOURCE_GEOCODED, SOURCE_KNOWN_PLACE = 0, 1, 2, 3
+
+
+def normalize_name(text):
+    """The gazetteer's key for a name: lower-case words, punctuation removed."""
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", str(text).lower()).split())
+
+
+def load_bundled_place_names(csv_path=GAZETTEER_EXTRA_PATH):
+    """
+    Reads extra gazetteer entries (aliases such as "Madras", well-known landmarks)
+    from a CSV file with name, lat, lng and label columns.
+    Returns an empty list if the file is missing.
+    """
+    entries = []
+    try:
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    lat, lng = float(row['lat']), float(row['lng'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                name = row.get('name')
+                if name:
+                    entries.append({'name': name, 'lat': lat, 'lng': lng, 'label': row.get('label') or name})
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Warning: could not read place names from {csv_path}: {e}")
+    return entries
+
+
+class Gazetteer:
+    """
+    Offline geocoder for names the app already knows: the bundled place names,
+    the cities of the budget dataset and names users confirmed before. Exact
+    lookups are a dict access on the normalized name; misspelt names fall back
+    to difflib fuzzy matching over the same keys.
+
+    Places from the known places index (points of interest found by any
+    session's searches) feed the autocomplete, but lookup() only resolves to one
+    when the query names where it is, as in "Bus Stand, Dindigul": on its own, a
+    generic name would go to whichever such place happened to be seen first.
+
+    Locations users confirm are remembered (with how often they were picked), so
+    names geocoded once resolve locally afterwards and popular places are
+    suggested first by the prefix autocomplete.
+    """
+
+    def __init__(self, known_places=None, dataset_path=DATASET_PATH, extra_path=GAZETTEER_EXTRA_PATH,
+                 usage_path=GAZETTEER_USAGE_PATH):
+        self.known_places = known_places if known_places is not None else get_known_places()
+        self.usage_path = usage_path
+        self._lock = threading.Lock()
+        self._entries = {}  # normalized name -> ((source rank, -popularity), entry)
+        self._uses = {}     # normalized name -> times picked by users
+        self._geocoded = {}  # normalized name -> entry learned from Nominatim
+        # Fuzzy-matching keys and the autocomplete arrays are rebuilt from a snapshot
+        # in the background (see _refresh_index), so requests never wait for a sort
+        self._names = []    # Keys for fuzzy matching (known places excluded)
+        self._prefixes = []  # Sorted word-start suffixes of the keys, for autocomplete
+        self._prefix_ranks = []  # Position in _ranked_keys of the key each suffix belongs to
+        self._ranked_keys = []  # Keys in suggestion order
+        self._generation = 0  # Bumped by every change to entries or pick counts
+        self._index_generation = None  # Generation the current index was built from
+        self._index_built_at = 0.0
+        self._rebuilding = False
+
+        for entry in load_bundled_place_names(extra_path):
+            self._add(entry, SOURCE_BUNDLED)
+        for city in load_dataset_cities(dataset_path):
+            self._add(self._entry_from_place(city), SOURCE_DATASET)
+        self._load_usage()
+        self._on_places_added(self.known_places.all_places())
+        self.known_places.add_listener(self._on_places_added)
+        with self._lock:
+            # Sorting tens of thousands of names takes a while: do it before the first request needs it
+            self._refresh_index()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _entry_from_place(place):
+        location = place.get('location') or {}
+        name = (place.get('displayName') or {}).get('text', '')
+        if not name or location.get('latitude') is None or location.get('longitude') is None:
+            return None
+        return {
+            'name': name,
+            'lat': location['latitude'],
+            'lng': location['longitude'],
+            'label': place.get('formattedAddress') or name,
+        }
+
+    def _on_places_added(self, places):
+        with self._lock:
+            for place in places:
+                entry = self._entry_from_place(place)
+                if entry:
+                    self._add(entry, SOURCE_KNOWN_PLACE, popularity=place.get('userRatingCount', 0))
+
+    def _add(self, entry, source, popularity=0):
+        if entry is None:
+            return
+        key = normalize_name(entry['name'])
+        if not key:
+            return
+        rank = (source, -(popularity or 0))
+        existing = self._entries.get(key)
+        if existing is None or rank <= existing[0]:
+            self._entries[key] = (rank, entry)
+            self._generation += 1
+
+    @staticmethod
+    def _build_index(entries, uses):
+        """Returns (fuzzy-matching names, ranked keys, sorted prefixes, prefix ranks) for a snapshot of the entries."""
+        names = [key for key, ((source, _), _) in entries.items() if source != SOURCE_KNOWN_PLACE]
+        # Suggestion order: most picked, then by source, then most reviewed, then shortest.
+        # Keys are stored as their position in that order, so ranking compares plain ints.
+        ranked_keys = sorted(entries, key=lambda key: (-uses.get(key, 0), entries[key][0], len(key), key))
+        prefixes = []
+        for position, key in enumerate(ranked_keys):
+            # Every word start is indexed, so "temple" also finds "meenakshi amman temple"
+            start = 0
+            while start != -1:
+                prefixes.append((key[start:], position))
+                start = key.find(' ', start)
+                start = start + 1 if start != -1 else -1
+        prefixes.sort()
+        return names, ranked_keys, [suffix for suffix, _ in prefixes], [position for _, position in prefixes]
+
+    def _refresh_index(self):
+        """
+        Starts a background rebuild of the fuzzy-matching keys and autocomplete arrays
+        if entries changed. Call with the lock held. The first index is started from
+        the constructor; after that, changes (new known places, picks) are folded in at
+        most every INDEX_REBUILD_INTERVAL seconds. Lookups use the previous index (empty
+        until the first build is done) meanwhile, so no request waits for a sort.
+        """
+        if self._index_generation == self._generation or self._rebuilding:
+            return
+        if self._index_generation is None or time.monotonic() - self._index_built_at >= INDEX_REBUILD_INTERVAL:
+            self._rebuilding = True
+            snapshot = (self._generation, dict(self._entries), dict(self._uses))
+            threading.Thread(
+                target=self._rebuild_in_background, args=(snapshot,), name="gazetteer-index", daemon=True
+            ).start()
+
+    def _rebuild_in_background(self, snapshot):
+        generation, entries, uses = snapshot
+        try:
+            index = self._build_index(entries, uses)
+            with self._lock:
+                self._install_index(generation, *index)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _install_index(self, generation, names, ranked_keys, prefixes, prefix_ranks):
+        self._names, self._ranked_keys = names, ranked_keys
+        self._prefixes, self._prefix_ranks = prefixes, prefix_ranks
+        self._index_generation = generation
+        self._index_built_at = time.monotonic()
+
+    def lookup(self, name, fuzzy=True):
+        """
+        Finds a name in the gazetteer.
+
+        Args:
+            name (str): A place name as typed, e.g. "Madurai" or "meenakshi temple, madurai".
+            fuzzy (bool, optional): Whether to fall back to approximate matching for typos.
+
+        Returns:
+            dict: {'name', 'lat', 'lng', 'label'} of the best entry, or None if the name is unknown.
+        """
+        key = normalize_name(name)
+        if not key:
+            return None
+        # "Meenakshi Amman Temple, Madurai" is looked up as "Meenakshi Amman Temple" when the
+        # full text is unknown, but only if the rest agrees with the entry's label:
+        # "Salem, Oregon" must go to Nominatim rather than resolve to Salem in Tamil Nadu
+        candidates = [(key, None)]
+        first_part, _, rest = str(name).partition(',')
+        first_part = normalize_name(first_part)
+        if first_part and first_part != key:
+            candidates.append((first_part, set(normalize_name(rest).split())))
+
+        with self._lock:
+            for candidate, qualifiers in candidates:
+                found = self._entries.get(candidate)
+                if found and self._accepts(found, qualifiers):
+                    return found[1]
+            if not fuzzy:
+                return None
+            self._refresh_index()
+            names = self._names
+
+        for candidate, qualifiers in candidates:
+            if len(candidate) < FUZZY_MIN_LENGTH:
+                continue
+            matches = difflib.get_close_matches(candidate, names, n=1, cutoff=FUZZY_MATCH_CUTOFF)
+            if matches:
+                with self._lock:
+                    found = self._entries[matches[0]]
+                if self._accepts(found, qualifiers):
+                    return found[1]
+        return None
+
+    @classmethod
+    def _accepts(cls, found, qualifiers):
+        """Whether lookup() may answer with an entry ((rank, entry) as stored) for a query with these qualifiers."""
+        (source, _), entry = found
+        if source == SOURCE_KNOWN_PLACE and not (qualifiers or set()) - COUNTRY_WORDS:
+            return False
+        return cls._qualifiers_match(entry, qualifiers)
+
+    @staticmethod
+    def _qualifiers_match(entry, qualifiers):
+        """True if every word after the comma of a query appears in the entry's label (or is the country)."""
+        if not qualifiers:
+            return True
+        return qualifiers <= set(normalize_name(entry['label']).split()) | COUNTRY_WORDS
+
+    def suggest(self, prefix, limit=SUGGEST_LIMIT):
+        """
+        Autocompletes a partially typed name: entries with a word starting with the
+        prefix, most often picked first, then dataset cities and bundled names before
+        other places, then the most reviewed. Names users typed and Nominatim resolved
+        (possibly someone's address) are only suggested once picked more than once.
+
+        Args:
+            prefix (str): What the user has typed so far.
+            limit (int, optional): Maximum number of suggestions.
+
+        Returns:
+            list: Entries as returned by lookup(), best first.
+        """
+        prefix = normalize_name(prefix)
+        if len(prefix) < SUGGEST_MIN_PREFIX:
+            return []
+        with self._lock:
+            self._refresh_index()
+            start = bisect.bisect_left(self._prefixes, prefix)
+            end = bisect.bisect_left(self._prefixes, prefix + '\uffff', lo=start)
+            # A name can match on several word starts, and rarely picked free-text
+            # names are skipped, hence the extra candidates
+            suggestions = []
+            for position in sorted(set(heapq.nsmallest(limit * 4, self._prefix_ranks[start:end]))):
+                key = self._ranked_keys[position]
+                (source, _), entry = self._entries[key]
+                if source == SOURCE_GEOCODED and self._uses.get(key, 0) < GEOCODED_SUGGEST_MIN_USES:
+                    continue
+                suggestions.append(entry)
+                if len(suggestions) == limit:
+                    break
+            return suggestions
+
+    def record_use(self, name, lat=None, lng=None, label=None):
+        """
+        Counts a location a user confirmed. A name the gazetteer does not know yet is
+        added with the given coordinates (e.g. from Nominatim), so it resolves locally
+        from then on.
+        """
+        key = normalize_name(name)
+        if not key:
+            return
+        with self._lock:
+            if key not in self._entries:
+                if lat is None or lng is None:
+                    return
+                entry = {'name': " ".join(str(name).split()), 'lat': lat, 'lng': lng, 'label': label or name}
+                self._geocoded[key] = entry
+                self._add(entry, SOURCE_GEOCODED)
+            self._uses[key] = self._uses.get(key, 0) + 1
+            self._generation += 1  # Pick counts are part of the suggestion ranks
+            snapshot = {'uses': dict(self._uses), 'geocoded': list(self._geocoded.values())}
+        self._save_usage(snapshot)
+
+    # --- Persistence ---
+
+    def _load_usage(self):
+        if not os.path.exists(self.usage_path):
+            return
+        try:
+            with open(self.usage_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not load gazetteer usage from {self.usage_path}: {e}")
+            return
+        for entry in snapshot.get('geocoded', []):
+            self._geocoded[normalize_name(entry['name'])] = entry
+            self._add(entry, SOURCE_GEOCODED)
+        self._uses.update(snapshot.get('uses', {}))
+
+    def _save_usage(self, snapshot):
+        """Writes the geocoded names and pick counts to disk (atomically)."""
+        directory = os.path.dirname(self.usage_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = None
+        try:
+            # A temp file per call: picks from concurrent sessions may save at the same time
+            fd, temp_path = tempfile.mkstemp(
+                dir=directory or '.', prefix=os.path.basename(self.usage_path), suffix='.tmp'
+            )
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(temp_path, self.usage_path)
+        except OSError as e:
+            print(f"Warning: could not save gazetteer usage to {self.usage_path}: {e}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """Returns the process-wide gazetteer."""
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = Gazetteer()
+        return _gazetteer
@@ -0,0 +1,26 @@
+import json
+
+from geopy.adapters import AdapterHTTPError, BaseSyncAdapter
+
+from src.transport import get_transport
+
+
+class TransportAdapter(BaseSyncAdapter):
+    """
+    geopy adapter that sends Nominatim requests through the app's transport,
+    so geocoding can be recorded, replayed or pointed at the local stand-in server.
+    """
+
+    def get_json(self, url, *, timeout, headers):
+        return json.loads(self.get_text(url, timeout=timeout, headers=headers))
+
+    def get_text(self, url, *, timeout, headers):
+        response = get_transport().get(url, headers=headers, timeout=timeout)
+        if response.status_code >= 400:
+            raise AdapterHTTPError(
+                f"Non-successful status code {response.status_code}",
+                status_code=response.status_code,
+                headers=dict(response.headers),
+                text=response.text,
+            )
+        return response.text
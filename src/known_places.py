@@ -0,0 +1,270 @@
+import heapq
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from src.disk_cache import CACHE_DIR
+
+# --- Known Places Index Configuration ---
+KNOWN_PLACES_PATH = os.path.join(CACHE_DIR, "known_places.json")
+GRID_CELL_DEGREES = 0.05          # ~5.5 km grid cells
+COVERAGE_TTL = 7 * 24 * 60 * 60   # How long an API search keeps a cell "covered"
+SAVE_INTERVAL = 30                # Seconds between snapshots written to disk
+EARTH_RADIUS_M = 6371000.0
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _cell(lat, lng):
+    return (math.floor(lat / GRID_CELL_DEGREES), math.floor(lng / GRID_CELL_DEGREES))
+
+
+def _place_coordinates(place):
+    location = place.get('location') or {}
+    lat, lng = location.get('latitude'), location.get('longitude')
+    if lat is None or lng is None:
+        return None
+    return lat, lng
+
+
+class KnownPlaces:
+    """
+    In-memory spatial index of every place the app has seen in an API response,
+    bucketed into a regular lat/lon grid. Answers radius and k-nearest queries
+    without the network, and tracks which grid cells were recently covered by an
+    API search so callers know when the local answer is good enough.
+
+    Places can carry tags (e.g. 'attractions') naming the kind of search they
+    came from, so a query can be limited to the same kind of results.
+    """
+
+    def __init__(self, path=KNOWN_PLACES_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # One snapshot written at a time
+        self._places = {}    # place_id -> place dict
+        self._tags = {}      # place_id -> set of tags
+        self._grid = {}      # cell -> set of place_ids
+        self._coverage = {}  # (tag, cell, radius) -> last refreshed timestamp
+        self._listeners = []  # Called with each batch of added places
+        self._dirty = False
+        self._last_saved = time.time()
+        self._load()
+
+    def __len__(self):
+        return len(self._places)
+
+    # --- Ingestion ---
+
+    def add_listener(self, callback):
+        """Registers callback(places) to be called with every batch of added or refreshed places."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def all_places(self):
+        with self._lock:
+            return list(self._places.values())
+
+    def add_places(self, places, tag=None):
+        """Adds or refreshes places (dicts with 'id' and 'location') in the index."""
+        added = []
+        with self._lock:
+            for place in places or []:
+                place_id = place.get('id')
+                coordinates = _place_coordinates(place)
+                if not place_id or coordinates is None:
+                    continue
+                existing = self._places.get(place_id)
+                if existing is not None:
+                    old_coordinates = _place_coordinates(existing)
+                    if old_coordinates is not None:
+                        self._grid.get(_cell(*old_coordinates), set()).discard(place_id)
+                    place = {**existing, **place}
+                self._places[place_id] = place
+                self._grid.setdefault(_cell(*coordinates), set()).add(place_id)
+                if tag:
+                    self._tags.setdefault(place_id, set()).add(tag)
+                added.append(place)
+            self._dirty = True
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(added)
+        self.save_if_due()
+
+    def mark_covered(self, tag, lat, lng, radius_m):
+        """Records that an API search for tag around (lat, lng) has just been ingested."""
+        with self._lock:
+            self._coverage[(tag, _cell(lat, lng), int(radius_m))] = time.time()
+            self._dirty = True
+        self.save_if_due()
+
+    def is_covered(self, tag, lat, lng, radius_m, max_age=COVERAGE_TTL):
+        """True if an API search for tag with this radius was ingested for this cell within max_age."""
+        refreshed_at = self._coverage.get((tag, _cell(lat, lng), int(radius_m)))
+        return refreshed_at is not None and time.time() - refreshed_at < max_age
+
+    # --- Queries ---
+
+    def _cells_within(self, lat, lng, radius_m):
+        d_lat = math.degrees(radius_m / EARTH_RADIUS_M)
+        d_lng = d_lat / max(math.cos(math.radians(lat)), 1e-6)
+        min_row, min_col = _cell(lat - d_lat, lng - d_lng)
+        max_row, max_col = _cell(lat + d_lat, lng + d_lng)
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                yield (row, col)
+
+    def place_ids_near(self, lat, lng, radius_m):
+        """
+        Returns the IDs of known places in the grid cells overlapping the circle: every
+        place within radius_m of (lat, lng) and some just outside. Cheap prefilter for
+        callers that rank places by other criteria first.
+        """
+        place_ids = set()
+        with self._lock:
+            for cell in self._cells_within(lat, lng, radius_m):
+                place_ids.update(self._grid.get(cell, ()))
+        return place_ids
+
+    def within_radius(self, lat, lng, radius_m, tag=None, limit=None):
+        """
+        Returns known places within radius_m of (lat, lng), nearest first.
+        Args:
+            lat (float): Latitude of the center point.
+            lng (float): Longitude of the center point.
+            radius_m (float): Search radius in metres.
+            tag (str, optional): Only return places carrying this tag.
+            limit (int, optional): Maximum number of places to return.
+        Returns:
+            list: Place dictionaries.
+        """
+        matches = []
+        with self._lock:
+            for cell in self._cells_within(lat, lng, radius_m):
+                for place_id in self._grid.get(cell, ()):
+                    if tag and tag not in self._tags.get(place_id, ()):
+                        continue
+                    place = self._places[place_id]
+                    distance = haversine_m(lat, lng, *_place_coordinates(place))
+                    if distance <= radius_m:
+                        matches.append((distance, place_id, place))
+        matches.sort(key=lambda match: match[0])
+        return [place for _, _, place in matches[:limit]]
+
+    def nearest(self, lat, lng, k=5, tag=None, max_radius_m=50000):
+        """
+        Returns up to k known places nearest to (lat, lng), searching ring by ring
+        outwards through the grid and stopping at max_radius_m.
+        """
+        origin_row, origin_col = _cell(lat, lng)
+        cell_m = math.radians(GRID_CELL_DEGREES) * EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 1e-6)
+        max_ring = int(max_radius_m / cell_m) + 1
+        best = []  # max-heap of (-distance, place_id)
+        with self._lock:
+            for ring in range(max_ring + 1):
+                for row in range(origin_row - ring, origin_row + ring + 1):
+                    for col in range(origin_col - ring, origin_col + ring + 1):
+                        if max(abs(row - origin_row), abs(col - origin_col)) != ring:
+                            continue  # Only the border of this ring; inner cells were done already
+                        for place_id in self._grid.get((row, col), ()):
+                            if tag and tag not in self._tags.get(place_id, ()):
+                                continue
+                            distance = haversine_m(lat, lng, *_place_coordinates(self._places[place_id]))
+                            if distance > max_radius_m:
+                                continue
+                            if len(best) < k:
+                                heapq.heappush(best, (-distance, place_id))
+                            elif distance < -best[0][0]:
+                                heapq.heapreplace(best, (-distance, place_id))
+                # Anything in further rings is at least ring * cell_m away
+                if len(best) >= k and -best[0][0] <= ring * cell_m:
+                    break
+            return [self._places[place_id] for _, place_id in sorted(best, key=lambda item: -item[0])]
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not load known places from {self.path}: {e}")
+            return
+        tags = snapshot.get('tags', {})
+        for place in snapshot.get('places', []):
+            place_id = place.get('id')
+            coordinates = _place_coordinates(place)
+            if not place_id or coordinates is None:
+                continue
+            self._places[place_id] = place
+            self._grid.setdefault(_cell(*coordinates), set()).add(place_id)
+            if place_id in tags:
+                self._tags[place_id] = set(tags[place_id])
+        for tag, row, col, radius, refreshed_at in snapshot.get('coverage', []):
+            self._coverage[(tag, (row, col), radius)] = refreshed_at
+
+    def save_if_due(self):
+        if self._dirty and time.time() - self._last_saved >= SAVE_INTERVAL:
+            # Another thread already writing a snapshot covers this one
+            if self._save_lock.acquire(blocking=False):
+                try:
+                    self._save()
+                finally:
+                    self._save_lock.release()
+
+    def save(self):
+        """Writes a snapshot of the index to disk (atomically)."""
+        with self._save_lock:
+            self._save()
+
+    def _save(self):
+        with self._lock:
+            snapshot = {
+                'places': list(self._places.values()),
+                'tags': {place_id: sorted(tags) for place_id, tags in self._tags.items()},
+                'coverage': [
+                    [tag, cell[0], cell[1], radius, refreshed_at]
+                    for (tag, cell, radius), refreshed_at in self._coverage.items()
+                ],
+            }
+            self._dirty = False
+            self._last_saved = time.time()
+        directory = os.path.dirname(self.path)
+        temp_path = None
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory or '.', prefix=os.path.basename(self.path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Warning: could not save known places to {self.path}: {e}")
+            self._dirty = True  # Retried at the next interval
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+_known_places = None
+_known_places_lock = threading.Lock()
+
+
+def get_known_places():
+    """Returns the process-wide index of known places."""
+    global _known_places
+    with _known_places_lock:
+        if _known_places is None:
+            _known_places = KnownPlaces()
+        return _known_places
@@ -1,50 +1,145 @@
-import streamlit as st
-import requests
-import folium
-from streamlit_folium import folium_static
-from geopy.geocoders import Nominatim
-import json
+import math
+import os
+from functools import lru_cache
+
+from src.disk_cache import CACHE_DIR, DiskCache
+from src.gazetteer import get_gazetteer
+from src.rate_limiter import rate_limiter
+from src.single_flight import api_calls
+
+# --- Geocoding Cache ---
+# Most lookups are for places someone has looked up before, so forward (name ->
+# coordinates) and reverse (coordinates -> name) results are kept on disk.
+GEOCODE_CACHE_PATH = os.path.join(CACHE_DIR, "geocode_cache.sqlite")
+GEOCODE_CACHE_MAX_BYTES = 20 * 1024 * 1024
+GEOCODE_CACHE_TTL = 30 * 24 * 60 * 60      # 30 days; place coordinates rarely change
+GEOCODE_NOT_FOUND_TTL = 24 * 60 * 60       # Unknown names are retried daily
+REVERSE_GEOCODE_CELL_DEGREES = 0.001       # ~110 m grid cell for reverse lookup keys
+
+geocode_cache = DiskCache(GEOCODE_CACHE_PATH, max_bytes=GEOCODE_CACHE_MAX_BYTES, default_ttl=GEOCODE_CACHE_TTL)
+
+
+@lru_cache(maxsize=1)
+def _get_geolocator():
+    """Returns the Nominatim client shared by all lookups."""
+    # geopy is imported on first use: it loads every geocoder module, which slows app startup
+    from geopy.geocoders import Nominatim
+    from src.geopy_transport import TransportAdapter
+
+    return Nominatim(user_agent="tourism_explorer_app", adapter_factory=TransportAdapter)
+
+
+def _normalize_location_name(location_name):
+    """Lower-cases the name and collapses whitespace so trivial variants share a cache entry."""
+    return " ".join(str(location_name).lower().split())
+
+
+def _forward_cache_key(location_name):
+    return f"forward:{_normalize_location_name(location_name)}"
+
+
+def _reverse_cache_key(latitude, longitude):
+    return "reverse:{}:{}".format(
+        math.floor(latitude / REVERSE_GEOCODE_CELL_DEGREES),
+        math.floor(longitude / REVERSE_GEOCODE_CELL_DEGREES),
+    )
+
+
+def resolve_location(location_name):
+    """
+    Resolves a typed location to coordinates and a display label, and counts it
+    as picked by a user. Names known to the gazetteer are answered locally;
+    anything else is geocoded with Nominatim, labelled by a reverse lookup and
+    added to the gazetteer.
+
+    Args:
+        location_name (str): A city, landmark or address.
+
+    Returns:
+        tuple: (latitude, longitude, label), or (None, None, None) if the location cannot be found.
+    Raises:
+        RateLimitExceeded: If Nominatim is needed but its rate limit or daily quota is used up.
+    """
+    gazetteer = get_gazetteer()
+    entry = gazetteer.lookup(location_name)
+    if entry:
+        gazetteer.record_use(entry['name'])
+        return entry['lat'], entry['lng'], entry['label']
+    lat, lon = _nominatim_coordinates(location_name)
+    if lat is None or lon is None:
+        return None, None, None
+    label = get_location_name(lat, lon)
+    gazetteer.record_use(location_name, lat, lon, label)
+    return lat, lon, label
 
 def get_coordinates(location_name):
     """
-    Gets the latitude and longitude coordinates for a given location name using Nominatim.
+    Gets the latitude and longitude coordinates for a given location name.
+    Names known to the gazetteer (dataset cities, bundled place names, locations
+    users confirmed) are answered locally; anything else goes to Nominatim.
+    Raises RateLimitExceeded if that request cannot be sent.
     """
-    geolocator = Nominatim(user_agent="tourism_explorer_app")
+    entry = get_gazetteer().lookup(location_name)
+    if entry:
+        return entry['lat'], entry['lng']
+    return _nominatim_coordinates(location_name)
+
+def _nominatim_coordinates(location_name):
+    """
+    Geocodes a name with Nominatim. Results are cached on disk by normalized name,
+    and concurrent lookups of the same name share a single request.
+    """
+    cached = geocode_cache.get(_forward_cache_key(location_name))
+    if cached is not None:
+        return cached['lat'], cached['lon']
+    key = ("nominatim_geocode", _normalize_location_name(location_name))
+    return api_calls.do(key, _geocode, location_name)
+
+def _geocode(location_name):
+    # Outside the try: a throttled lookup is reported as such, not as "not found"
+    rate_limiter.acquire('nominatim')
     try:
-        location = geolocator.geocode(location_name)
-        if location:
-            return location.latitude, location.longitude
-        else:
-            return None, None
+        location = _get_geolocator().geocode(location_name)
     except Exception as e:
         # st.error(f"Geocoding error for '{location_name}': {e}") # Suppress for cleaner output
+        return None, None  # Errors are not cached, so the next lookup tries again
+
+    if not location:
+        geocode_cache.set(_forward_cache_key(location_name), {'lat': None, 'lon': None}, ttl=GEOCODE_NOT_FOUND_TTL)
         return None, None
+    geocode_cache.set(_forward_cache_key(location_name), {'lat': location.latitude, 'lon': location.longitude})
+    # The app names a confirmed location right after geocoding it; the forward
+    # result already carries an address, which saves the reverse request.
+    reverse_key = _reverse_cache_key(location.latitude, location.longitude)
+    if location.address and geocode_cache.get(reverse_key) is None:
+        geocode_cache.set(reverse_key, location.address)
+    return location.latitude, location.longitude
 
 def get_location_name(latitude, longitude):
     """
     Gets a human-readable location name from coordinates using Nominatim.
+    Results are cached on disk per ~100 m grid cell, and concurrent lookups of
+    the same cell share a single request.
+    Raises RateLimitExceeded if the request cannot be sent.
     """
-    geolocator = Nominatim(user_agent="tourism_explorer_app")
+    reverse_key = _reverse_cache_key(latitude, longitude)
+    cached = geocode_cache.get(reverse_key)
+    if cached is not None:
+        return cached
+    return api_calls.do(("nominatim_reverse", reverse_key), _reverse_geocode, latitude, longitude)
+
+def _reverse_geocode(latitude, longitude):
+    rate_limiter.acquire('nominatim')
     try:
-        reverse_location = geolocator.reverse(f"{latitude}, {longitude}", exactly_one=True)
-        if reverse_location:
-            return reverse_location.address
-        else:
-            return "Location name not found"
+        reverse_location = _get_geolocator().reverse(f"{latitude}, {longitude}", exactly_one=True)
     except Exception as e:
         # st.error(f"Reverse geocoding error for {latitude}, {longitude}: {e}") # Suppress for cleaner output
         return "Error fetching location name"
 
-# The get_precise_location_gcloud_http function has been removed as requested.
+    if reverse_location:
+        geocode_cache.set(_reverse_cache_key(latitude, longitude), reverse_location.address)
+        return reverse_location.address
+    else:
+        return "Location name not found"
 
-def display_map(latitude, longitude, location_name="Location"):
-    """
-    Displays a Folium map centered at the given coordinates.
-    """
-    if latitude is None or longitude is None:
-        latitude, longitude = 20.5937, 78.9629 # Center of India approximate
-        location_name = "Default Location (Could not find specific coordinates)"
-
-    m = folium.Map(location=[latitude, longitude], zoom_start=12)
-    folium.Marker([latitude, longitude], popup=location_name).add_to(m)
-    folium_static(m, width=600, height=250)
+# The get_precise_location_gcloud_http function has been removed as requested.
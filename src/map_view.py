@@ -0,0 +1,94 @@
+from functools import lru_cache
+
+# --- Map Rendering Configuration ---
+MAP_HTML_CACHE_SIZE = 128       # Rendered maps kept in memory (shared by all sessions)
+MAP_COORDINATE_DECIMALS = 5     # ~1 m; finer differences render the same map
+DEFAULT_CENTER = (20.5937, 78.9629)  # Center of India approximate
+MAX_CLUSTERED_MARKERS = 200     # Upper bound on markers in one result map
+
+
+def _rounded(value):
+    return round(float(value), MAP_COORDINATE_DECIMALS)
+
+
+@lru_cache(maxsize=MAP_HTML_CACHE_SIZE)
+def _render_map_html(center, zoom, markers, width, height, cluster):
+    """
+    Builds a Folium map and returns its HTML. Arguments are hashable (rounded
+    coordinates, a tuple of (lat, lng, popup) markers) so reruns showing the same
+    map reuse the HTML instead of building and serializing it again.
+    """
+    # Imported on first use: folium (and its branca/jinja2 stack) is slow to import
+    import folium
+
+    # Without a zoom the view is fitted to the markers below
+    m = folium.Map(location=list(center), zoom_start=zoom if zoom is not None else 10)
+    if cluster:
+        from folium.plugins import MarkerCluster
+        layer = MarkerCluster().add_to(m)
+    else:
+        layer = m
+    for lat, lng, popup in markers:
+        folium.Marker([lat, lng], popup=popup or None, tooltip=popup or None).add_to(layer)
+    if zoom is None and markers:
+        lats = [lat for lat, _, _ in markers]
+        lngs = [lng for _, lng, _ in markers]
+        m.fit_bounds([[min(lats), min(lngs)], [max(lats), max(lngs)]], padding=(20, 20))
+
+    figure = folium.Figure(width=width, height=height).add_child(m)
+    return figure.render()
+
+
+def _show_map_html(html, width, height):
+    import streamlit.components.v1 as components
+
+    # Identical HTML on a rerun leaves the browser's map iframe as it is
+    components.html(html, width=width, height=height + 10)
+
+
+def display_map(latitude, longitude, location_name="Location", zoom=12, width=600, height=250):
+    """
+    Displays a Folium map centered at the given coordinates.
+    """
+    if latitude is None or longitude is None:
+        latitude, longitude = DEFAULT_CENTER
+        location_name = "Default Location (Could not find specific coordinates)"
+
+    center = (_rounded(latitude), _rounded(longitude))
+    html = _render_map_html(center, zoom, ((center[0], center[1], location_name),), width, height, False)
+    _show_map_html(html, width, height)
+
+
+def display_places_map(places, width=700, height=400):
+    """
+    Displays a whole list of places (Places results with a 'location') on one map,
+    with nearby markers clustered and the view fitted to the results.
+
+    Args:
+        places (list): Places results; entries without coordinates are skipped.
+        width (int, optional): Map width in pixels.
+        height (int, optional): Map height in pixels.
+
+    Returns:
+        int: Number of places shown.
+    """
+    markers = []
+    for place in places[:MAX_CLUSTERED_MARKERS]:
+        location = place.get('location') or {}
+        if location.get('latitude') is None or location.get('longitude') is None:
+            continue
+        name = (place.get('displayName') or {}).get('text', '')
+        markers.append((_rounded(location['latitude']), _rounded(location['longitude']), name))
+    if not markers:
+        return 0
+
+    # Order does not change the map, so it does not change the cache key either
+    markers = tuple(sorted(markers))
+    center = (
+        _rounded(sum(lat for lat, _, _ in markers) / len(markers)),
+        _rounded(sum(lng for _, lng, _ in markers) / len(markers)),
+    )
+    zoom = 12 if len(markers) == 1 else None
+    html = _render_map_html(center, zoom, markers, width, height, True)
+    _show_map_html(html, width, height)
+    return len(markers)
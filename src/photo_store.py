@@ -0,0 +1,205 @@
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from src.disk_cache import CACHE_DIR
+from src.rate_limiter import rate_limiter
+from src.single_flight import api_calls
+from src.transport import get_transport
+
+# --- Photo Store Configuration ---
+PHOTO_CACHE_DIR = os.path.join(CACHE_DIR, "photos")
+PHOTO_CACHE_MAX_BYTES = 500 * 1024 * 1024
+# Thumbnails are generated at these widths only; requests are snapped to the next one up.
+PHOTO_WIDTHS = (200, 400, 800)
+PHOTO_MEDIA_URL = "https://places.googleapis.com/v1/{photo_name}/media"
+THUMBNAIL_JPEG_QUALITY = 85
+
+
+class PhotoStore:
+    """
+    Server-side store for place photos. Each photo.name is downloaded from Google
+    once (at the largest fixed width), resized to every width in PHOTO_WIDTHS and
+    kept in a content-addressed on-disk cache with a size cap and LRU eviction.
+    Pages are then served the bytes directly, so the API key never reaches the browser.
+    """
+
+    def __init__(self, root=PHOTO_CACHE_DIR, max_bytes=PHOTO_CACHE_MAX_BYTES, widths=PHOTO_WIDTHS):
+        """
+        Args:
+            root (str): Directory holding the blobs and the index database.
+            max_bytes (int, optional): Upper bound on the total size of stored images.
+            widths (tuple, optional): Fixed thumbnail widths in pixels, ascending.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.widths = tuple(sorted(widths))
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS photos ("
+                " photo_name TEXT NOT NULL, width INTEGER NOT NULL, digest TEXT NOT NULL,"
+                " PRIMARY KEY (photo_name, width))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                " digest TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _blob_path(self, digest):
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.jpg")
+
+    def snap_width(self, width):
+        """Returns the smallest fixed width that is at least width (or the largest one)."""
+        for fixed_width in self.widths:
+            if fixed_width >= width:
+                return fixed_width
+        return self.widths[-1]
+
+    def get_photo(self, photo_name, api_key, width=400):
+        """
+        Returns the JPEG bytes of a place photo at (about) the requested width.
+        Args:
+            photo_name (str): The 'name' field from a photo object in Places API response.
+            api_key (str): Your Google Cloud API key.
+            width (int, optional): Desired width in pixels. Defaults to 400.
+        Returns:
+            bytes: The image, or None if it could not be fetched.
+        Raises:
+            RateLimitExceeded: If the photo must be downloaded but the request cannot be sent.
+        """
+        if not photo_name:
+            return None
+        width = self.snap_width(width)
+        content = self._read(photo_name, width)
+        if content is not None:
+            return content
+        if not api_key:
+            return None
+        # Concurrent views of the same place download each photo only once
+        renditions = api_calls.do(("place_photo", photo_name), self._download, photo_name, api_key)
+        if not renditions:
+            return None
+        return renditions.get(width)
+
+    def _read(self, photo_name, width):
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT digest FROM photos WHERE photo_name = ? AND width = ?", (photo_name, width)
+            ).fetchone()
+            if row is None:
+                return None
+            digest = row[0]
+            try:
+                with open(self._blob_path(digest), "rb") as f:
+                    content = f.read()
+            except OSError:
+                conn.execute("DELETE FROM photos WHERE digest = ?", (digest,))
+                conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                return None
+            conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        return content
+
+    def _download(self, photo_name, api_key):
+        # Outside the try: callers show a throttled download as such, not as a missing photo
+        rate_limiter.acquire('google_places')
+        try:
+            response = get_transport().get(
+                PHOTO_MEDIA_URL.format(photo_name=photo_name),
+                params={'key': api_key, 'maxWidthPx': self.widths[-1]},
+            )
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Error fetching place photo {photo_name}: {e}")
+            return None
+
+        renditions = self._make_renditions(response.content)
+        self._store(photo_name, renditions)
+        return renditions
+
+    def _make_renditions(self, content):
+        """Resizes the original to each fixed width. Without Pillow, every width gets the original."""
+        try:
+            from PIL import Image
+        except ImportError:
+            return {width: content for width in self.widths}
+
+        renditions = {}
+        try:
+            with Image.open(io.BytesIO(content)) as original:
+                original = original.convert("RGB")
+                for width in self.widths:
+                    image = original
+                    if original.width > width:
+                        height = round(original.height * width / original.width)
+                        image = original.resize((width, height), Image.LANCZOS)
+                    buffer = io.BytesIO()
+                    image.save(buffer, format="JPEG", quality=THUMBNAIL_JPEG_QUALITY, optimize=True)
+                    renditions[width] = buffer.getvalue()
+        except Exception as e:
+            print(f"Could not create thumbnails, storing original image: {e}")
+            renditions = {width: content for width in self.widths}
+        return renditions
+
+    def _store(self, photo_name, renditions):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            for width, content in renditions.items():
+                digest = hashlib.sha256(content).hexdigest()
+                path = self._blob_path(digest)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "wb") as f:
+                        f.write(content)
+                conn.execute(
+                    "INSERT OR REPLACE INTO blobs (digest, size, last_access) VALUES (?, ?, ?)",
+                    (digest, len(content), now),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO photos (photo_name, width, digest) VALUES (?, ?, ?)",
+                    (photo_name, width, digest),
+                )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for digest, size in conn.execute("SELECT digest, size FROM blobs ORDER BY last_access ASC").fetchall():
+            conn.execute("DELETE FROM photos WHERE digest = ?", (digest,))
+            conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+_photo_store = None
+_photo_store_lock = threading.Lock()
+
+
+def get_photo_store():
+    """Returns the process-wide photo store."""
+    global _photo_store
+    with _photo_store_lock:
+        if _photo_store is None:
+            _photo_store = PhotoStore()
+        return _photo_store
@@ -0,0 +1,253 @@
+import csv
+import re
+import threading
+from collections import Counter
+
+from src.errors import ExplorerError
+from src.explorer_utils import iter_places_text_search_pages
+from src.known_places import get_known_places, haversine_m
+
+# --- Catalogue Configuration ---
+DATASET_PATH = "data/tamil_nadu_tourist_place3.csv"
+CITY_ID_PREFIX = "city:"          # Catalogue entries for dataset cities have no Places ID
+FIELD_WEIGHTS = {'name': 3.0, 'types': 2.0, 'address': 1.0}
+MIN_MATCH_SCORE = 0.6             # Fraction of the query's trigrams a place must contain
+LOCAL_SEARCH_RADIUS_M = 50000     # Same radius the app uses for its location bias
+LOCAL_SEARCH_MIN_RESULTS = 5      # Fewer local matches than this means the API is asked instead
+LOCAL_SEARCH_MAX_RESULTS = 20
+
+
+def _normalize(text):
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", str(text).lower()).split())
+
+
+def _trigrams(text):
+    """Character trigrams of each word, padded so that short words and word starts count."""
+    grams = set()
+    for word in _normalize(text).split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def _document_fields(place):
+    return {
+        'name': (place.get('displayName') or {}).get('text', ''),
+        'types': " ".join(t.replace('_', ' ') for t in place.get('types', [])),
+        'address': place.get('formattedAddress', ''),
+    }
+
+
+def load_dataset_cities(csv_path=DATASET_PATH):
+    """
+    Builds catalogue entries (shaped like Places results) for the unique cities of the budget dataset.
+    Returns an empty list if the dataset is missing.
+    """
+    cities = {}
+    try:
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                city = row.get('city')
+                if not city or city in cities:
+                    continue
+                try:
+                    lat, lng = float(row['lat']), float(row['lng'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                district = row.get('district') or ''
+                cities[city] = {
+                    'id': f"{CITY_ID_PREFIX}{city}",
+                    'displayName': {'text': city},
+                    'formattedAddress': f"{city}, {district}" if district and district != city else city,
+                    'location': {'latitude': lat, 'longitude': lng},
+                    'types': ['locality', 'city'],
+                }
+    except OSError as e:
+        print(f"Warning: could not read cities from {csv_path}: {e}")
+    return list(cities.values())
+
+
+class PlaceCatalogue:
+    """
+    Local full-text catalogue of places: everything in the known places index
+    (i.e. every Places result the app has seen) plus the cities of the budget
+    dataset. Name, type and address are indexed by character trigrams, so
+    queries tolerate partial words and small typos. Results are ranked by text
+    match, rating and distance.
+
+    Searches with a radius only score the places in the known places grid cells
+    around the center (plus the dataset cities), and scoring runs outside the
+    lock, so ingestion of new places is not held up by searches.
+    """
+
+    def __init__(self, known_places=None, dataset_path=DATASET_PATH):
+        self.known_places = known_places if known_places is not None else get_known_places()
+        self._lock = threading.Lock()
+        self._documents = {}  # doc_id -> place dict
+        self._doc_grams = {}  # doc_id -> {field: set of trigrams}
+        self._postings = {}   # (field, trigram) -> set of doc_ids
+        self._city_ids = set()  # Dataset cities are not in the known places grid
+
+        for city in load_dataset_cities(dataset_path):
+            self._index(city)
+            self._city_ids.add(city['id'])
+        for place in self.known_places.all_places():
+            self._index(place)
+        # Keep the text index in step with places seen from now on
+        self.known_places.add_listener(self._on_places_added)
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _on_places_added(self, places):
+        for place in places:
+            self._index(place)
+
+    def _index(self, place):
+        doc_id = place.get('id')
+        if not doc_id:
+            return
+        with self._lock:
+            for (field, gram) in self._iter_doc_postings(doc_id):
+                self._postings.get((field, gram), set()).discard(doc_id)
+            field_grams = {field: _trigrams(text) for field, text in _document_fields(place).items()}
+            for field, grams in field_grams.items():
+                for gram in grams:
+                    self._postings.setdefault((field, gram), set()).add(doc_id)
+            self._documents[doc_id] = place
+            self._doc_grams[doc_id] = field_grams
+
+    def _iter_doc_postings(self, doc_id):
+        for field, grams in self._doc_grams.get(doc_id, {}).items():
+            for gram in grams:
+                yield field, gram
+
+    def search(self, query, lat=None, lng=None, radius_m=None, limit=LOCAL_SEARCH_MAX_RESULTS, include_cities=True):
+        """
+        Searches the catalogue.
+        Args:
+            query (str): Free text, e.g. "temple" or "beach chennai".
+            lat (float, optional): Latitude used for distance ranking and the radius filter.
+            lng (float, optional): Longitude used for distance ranking and the radius filter.
+            radius_m (float, optional): Only return places within this distance of (lat, lng).
+            limit (int, optional): Maximum number of results.
+            include_cities (bool, optional): Whether dataset cities may appear in the results.
+        Returns:
+            list: Place dictionaries, best match first.
+        """
+        query_grams = _trigrams(query)
+        if not query_grams:
+            return []
+
+        # Within a radius, only places in the grid cells around the center can match
+        candidates = None
+        if lat is not None and lng is not None and radius_m is not None:
+            candidates = self.known_places.place_ids_near(lat, lng, radius_m)
+            if include_cities:
+                candidates |= self._city_ids
+
+        # Snapshot the postings of the query's trigrams (set operations, so this is
+        # quick) and do the per-document counting after releasing the lock
+        with self._lock:
+            postings = {}
+            for field in FIELD_WEIGHTS:
+                for gram in query_grams:
+                    doc_ids = self._postings.get((field, gram))
+                    if doc_ids:
+                        postings[(field, gram)] = doc_ids & candidates if candidates is not None else set(doc_ids)
+
+        # Per field, count how many of the query's trigrams each document contains
+        field_hits = {field: Counter() for field in FIELD_WEIGHTS}
+        gram_docs = {}
+        for (field, gram), doc_ids in postings.items():
+            field_hits[field].update(doc_ids)
+            gram_docs.setdefault(gram, set()).update(doc_ids)
+        # Words may match in different fields ("temple" in the types, "madurai" in the address)
+        matched_grams = Counter()
+        for doc_ids in gram_docs.values():
+            matched_grams.update(doc_ids)
+        matches = [
+            doc_id for doc_id, count in matched_grams.items()
+            if count / len(query_grams) >= MIN_MATCH_SCORE
+            and (include_cities or not doc_id.startswith(CITY_ID_PREFIX))
+        ]
+        with self._lock:
+            documents = {doc_id: self._documents[doc_id] for doc_id in matches}
+
+        ranked = []
+        for doc_id in matches:
+            text_score = sum(
+                FIELD_WEIGHTS[field] * hits[doc_id] / len(query_grams) for field, hits in field_hits.items()
+            )
+            place = documents[doc_id]
+            score = text_score * (1.0 + 0.1 * (place.get('rating') or 0))
+            if lat is not None and lng is not None:
+                location = place.get('location') or {}
+                if location.get('latitude') is None:
+                    continue
+                distance_m = haversine_m(lat, lng, location['latitude'], location['longitude'])
+                if radius_m is not None and distance_m > radius_m:
+                    continue
+                score /= 1.0 + distance_m / 10000.0  # Halve the score every ~10 km
+            ranked.append((score, doc_id, place))
+
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return [place for _, _, place in ranked[:limit]]
+
+    def search_pages(self, query, location_bias=None, api_base_url=None, api_key=None, **search_options):
+        """
+        Generator with the same output as iter_places_text_search_pages, using the catalogue
+        as the first source and the Places API as the refresh source:
+          - if this query was refreshed from the API recently for this area and the catalogue
+            has enough matches, the local results are yielded without any request;
+          - otherwise the API is searched (and its results are ingested into the catalogue);
+          - if the API fails (network error, quota exhausted), local results are yielded instead.
+        Raises:
+            ExplorerError: If the API fails before answering and there is nothing local to show.
+        """
+        lat = lng = None
+        radius_m = LOCAL_SEARCH_RADIUS_M
+        circle = (location_bias or {}).get('circle')
+        if circle:
+            lat = circle['center']['latitude']
+            lng = circle['center']['longitude']
+            radius_m = circle.get('radius', radius_m)
+        coverage_tag = f"search:{_normalize(query)}"
+
+        if lat is not None and self.known_places.is_covered(coverage_tag, lat, lng, radius_m):
+            local_results = self.search(query, lat, lng, radius_m)
+            if len(local_results) >= LOCAL_SEARCH_MIN_RESULTS:
+                yield local_results
+                return
+
+        api_answered = False
+        try:
+            for page in iter_places_text_search_pages(
+                query, location_bias=location_bias, api_base_url=api_base_url, api_key=api_key, **search_options
+            ):
+                api_answered = True
+                yield page
+        except ExplorerError:
+            local_results = [] if api_answered else self.search(query, lat, lng, radius_m if lat is not None else None)
+            if not local_results:
+                raise
+            print(f"Places search for '{query}' failed, showing catalogue results instead")
+            yield local_results
+            return
+
+        if api_answered and lat is not None:
+            self.known_places.mark_covered(coverage_tag, lat, lng, radius_m)
+
+
+_catalogue = None
+_catalogue_lock = threading.Lock()
+
+
+def get_place_catalogue():
+    """Returns the process-wide place catalogue, building it on first use."""
+    global _catalogue
+    with _catalogue_lock:
+        if _catalogue is None:
+            _catalogue = PlaceCatalogue()
+        return _catalogue
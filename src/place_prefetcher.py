@@ -0,0 +1,115 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.errors import ExplorerError
+from src.explorer_utils import google_places_details_new
+from src.rate_limiter import PREFETCH, rate_limiter
+
+# --- Prefetch Configuration ---
+# Keep these small: every prefetched place is a billable Places Details call.
+# EXPLORER_PREFETCH_TOP_N results of each search are prefetched (0 disables prefetching),
+# with at most EXPLORER_PREFETCH_WORKERS requests in flight per session.
+PREFETCH_TOP_N = int(os.environ.get("EXPLORER_PREFETCH_TOP_N", "5"))
+PREFETCH_MAX_WORKERS = max(1, int(os.environ.get("EXPLORER_PREFETCH_WORKERS", "3")))
+PREFETCH_TIER = 'light'  # Enough to open the details page; heavy fields load lazily there
+
+
+class PlaceDetailsPrefetcher:
+    """
+    Fetches place details for the top results of a search in the background,
+    so that opening a place from the result list does not wait on the API.
+
+    One prefetcher is kept per user session. Starting a prefetch for a new
+    query cancels whatever is still queued for the previous one.
+    """
+
+    def __init__(self, api_base_url, api_key, top_n=PREFETCH_TOP_N, max_workers=PREFETCH_MAX_WORKERS, tier=PREFETCH_TIER):
+        """
+        Args:
+            api_base_url (str): The base URL for the Google Places API.
+            api_key (str): Your Google Cloud API key.
+            top_n (int, optional): How many results from the top of the list to prefetch.
+            max_workers (int, optional): Maximum number of concurrent details requests.
+            tier (str, optional): Field tier to prefetch (see PLACE_DETAILS_FIELD_TIERS).
+        """
+        self.api_base_url = api_base_url
+        self.api_key = api_key
+        self.top_n = top_n
+        self.tier = tier
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="place-prefetch")
+        self._lock = threading.Lock()
+        self._query = None
+        self._futures = {}  # place_id -> Future for the current query
+        self._store = {}    # place_id -> details dict, kept across queries for this session
+
+    def prefetch(self, query, places):
+        """
+        Starts fetching details for the first top_n places of a result list.
+        Args:
+            query (str): The search that produced the list; a different value cancels older work.
+            places (list): Place dictionaries as returned by the text search.
+        """
+        if not places or not self.api_base_url or not self.api_key:
+            return
+
+        with self._lock:
+            if query != self._query:
+                self._cancel_pending()
+                self._query = query
+            for place in places[:self.top_n]:
+                place_id = place.get('id')
+                if not place_id or place_id in self._store or place_id in self._futures:
+                    continue
+                # Prefetches run in the PREFETCH lane so they never delay interactive requests
+                future = self._executor.submit(rate_limiter.run_with_priority, PREFETCH, self._fetch, query, place_id)
+                self._futures[place_id] = future
+
+    def _fetch(self, query, place_id):
+        with self._lock:
+            if query != self._query:
+                return None  # Query changed while this task was waiting in the queue
+        try:
+            details = google_places_details_new(place_id, self.api_base_url, self.api_key, tier=self.tier)
+        except ExplorerError as e:
+            # Not fatal: opening the place later fetches (and reports) it interactively
+            print(f"Prefetch of place details for {place_id} failed: {e}")
+            details = None
+        with self._lock:
+            if details:
+                self._store[place_id] = details
+            self._futures.pop(place_id, None)
+        return details
+
+    def _cancel_pending(self):
+        for future in self._futures.values():
+            future.cancel()  # Only succeeds for tasks that have not started yet
+        self._futures = {}
+
+    def get(self, place_id, wait_timeout=None):
+        """
+        Returns prefetched details for place_id, or None if they are not available.
+        Args:
+            place_id (str): The unique identifier of the place.
+            wait_timeout (float, optional): If a fetch for this place is in flight, wait up to
+                                            this many seconds for it instead of returning None.
+        """
+        with self._lock:
+            details = self._store.get(place_id)
+            future = self._futures.get(place_id)
+        if details is not None or future is None or not wait_timeout:
+            return details
+        try:
+            return future.result(timeout=wait_timeout)
+        except Exception:
+            return None
+
+    def cancel(self):
+        """Cancels all queued prefetches, e.g. when the user leaves the result list."""
+        with self._lock:
+            self._cancel_pending()
+            self._query = None
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
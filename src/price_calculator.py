@@ -1,7 +1,6 @@
 import pandas as pd
 import pickle
 import os
-from sklearn.preprocessing import StandardScaler  # Ensure StandardScaler is imported
 
 
 class PriceCalculator:
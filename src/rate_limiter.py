@@ -0,0 +1,215 @@
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from src.disk_cache import CACHE_DIR
+from src.errors import ExplorerError
+
+# --- Priority Lanes ---
+# Lower number = higher priority. Interactive requests are made while a user waits
+# on a page; prefetch and warmup requests are speculative and can be dropped.
+INTERACTIVE = 0
+PREFETCH = 1
+WARMUP = 2
+
+# --- Provider Limits ---
+# rate: sustained requests per second, burst: bucket capacity,
+# daily_quota: hard cap per calendar day (None for no cap).
+PROVIDER_LIMITS = {
+    'google_places': {'rate': 10.0, 'burst': 20, 'daily_quota': 20000},
+    'nominatim': {'rate': 1.0, 'burst': 1, 'daily_quota': 10000},  # Nominatim usage policy: max 1 req/s
+    'openweathermap': {'rate': 1.0, 'burst': 5, 'daily_quota': 1000},  # Free tier: 60/min, 1000/day
+}
+
+# Fraction of the bucket that lower lanes must leave untouched, so that a burst of
+# prefetches can never starve an interactive request.
+LANE_RESERVE = {INTERACTIVE: 0.0, PREFETCH: 0.5, WARMUP: 0.75}
+
+# Latency budget per lane: how long a caller may queue for a token before failing fast.
+LANE_MAX_WAIT = {INTERACTIVE: 3.0, PREFETCH: 0.0, WARMUP: 0.0}
+
+QUOTA_DB_PATH = os.path.join(CACHE_DIR, "api_quota.sqlite")
+
+
+class RateLimitExceeded(ExplorerError):
+    """Raised when a request cannot be sent within its latency budget or the daily quota is used up."""
+
+    def __init__(self, provider, reason):
+        super().__init__(f"{provider}: {reason}")
+        self.provider = provider
+        self.reason = reason
+
+
+class _TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, level):
+        return max(0.0, (level - self.tokens) / self.rate)
+
+
+class _DailyQuota:
+    """Per-provider daily request counters stored in SQLite so they survive restarts."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quota ("
+                " day TEXT NOT NULL, provider TEXT NOT NULL, count INTEGER NOT NULL,"
+                " PRIMARY KEY (day, provider))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _today():
+        return datetime.date.today().isoformat()
+
+    def take(self, provider, daily_quota):
+        """
+        Counts one request unless daily_quota (None for no cap) is already reached.
+        Check and increment are a single statement, so concurrent threads and
+        processes cannot overshoot the quota together. Returns True if counted.
+        """
+        with self._connect() as conn:
+            if daily_quota is None:
+                cursor = conn.execute(
+                    "INSERT INTO quota (day, provider, count) VALUES (?, ?, 1)"
+                    " ON CONFLICT (day, provider) DO UPDATE SET count = count + 1",
+                    (self._today(), provider),
+                )
+            else:
+                cursor = conn.execute(
+                    "INSERT INTO quota (day, provider, count) SELECT ?, ?, 1 WHERE ? > 0"
+                    " ON CONFLICT (day, provider) DO UPDATE SET count = count + 1 WHERE count < ?",
+                    (self._today(), provider, daily_quota, daily_quota),
+                )
+            return cursor.rowcount == 1
+
+    def refund(self, provider):
+        """Gives back a request counted by take() that was not sent after all."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE quota SET count = count - 1 WHERE day = ? AND provider = ? AND count > 0",
+                (self._today(), provider),
+            )
+
+    def usage(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT provider, count FROM quota WHERE day = ?", (self._today(),)).fetchall()
+        return dict(rows)
+
+
+class RateLimiter:
+    """
+    Process-wide rate limiter with one token bucket per provider, priority lanes
+    and persistent daily quota accounting.
+
+    Call acquire() right before sending a request. It returns once a token is
+    available, or raises RateLimitExceeded if that would take longer than the
+    caller's latency budget.
+    """
+
+    def __init__(self, provider_limits=PROVIDER_LIMITS, quota_db_path=QUOTA_DB_PATH):
+        self.provider_limits = provider_limits
+        self._buckets = {
+            name: _TokenBucket(limits['rate'], limits['burst']) for name, limits in provider_limits.items()
+        }
+        self._waiting = {name: {lane: 0 for lane in LANE_RESERVE} for name in provider_limits}
+        self._condition = threading.Condition()
+        self._quota = _DailyQuota(quota_db_path)
+        self._local = threading.local()
+
+    @contextmanager
+    def priority(self, lane):
+        """Runs the enclosed requests of the current thread in the given lane."""
+        previous = getattr(self._local, 'lane', INTERACTIVE)
+        self._local.lane = lane
+        try:
+            yield
+        finally:
+            self._local.lane = previous
+
+    def current_lane(self):
+        """Returns the lane requests of the current thread run in."""
+        return getattr(self._local, 'lane', INTERACTIVE)
+
+    def run_with_priority(self, lane, fn, *args, **kwargs):
+        """Calls fn in the given lane; handy as a thread pool task."""
+        with self.priority(lane):
+            return fn(*args, **kwargs)
+
+    def acquire(self, provider, lane=None, max_wait=None):
+        """
+        Takes one token for provider, waiting if needed.
+        Args:
+            provider (str): A key of PROVIDER_LIMITS.
+            lane (int, optional): INTERACTIVE, PREFETCH or WARMUP. Defaults to the
+                                  lane set by priority() for this thread.
+            max_wait (float, optional): Latency budget in seconds. Defaults to LANE_MAX_WAIT[lane].
+        Raises:
+            RateLimitExceeded: If the daily quota is exhausted or no token frees up in time.
+        """
+        if lane is None:
+            lane = self.current_lane()
+        if max_wait is None:
+            max_wait = LANE_MAX_WAIT[lane]
+
+        daily_quota = self.provider_limits[provider].get('daily_quota')
+        bucket = self._buckets[provider]
+        waiting = self._waiting[provider]
+        # A lower lane needs one token on top of its reserve before it may spend one
+        required = 1.0 + (bucket.capacity - 1.0) * LANE_RESERVE[lane]
+        deadline = time.monotonic() + max_wait
+
+        with self._condition:
+            # The request is counted up front and refunded if it does not get a token
+            if not self._quota.take(provider, daily_quota):
+                raise RateLimitExceeded(provider, "daily quota exhausted")
+            waiting[lane] += 1
+            try:
+                while True:
+                    bucket.refill()
+                    higher_lane_waiting = any(waiting[other] for other in waiting if other < lane)
+                    if not higher_lane_waiting and bucket.tokens >= required:
+                        bucket.tokens -= 1.0
+                        break
+                    remaining = deadline - time.monotonic()
+                    wait_needed = bucket.seconds_until(required)
+                    if remaining <= 0 or (not higher_lane_waiting and wait_needed > remaining):
+                        self._quota.refund(provider)
+                        raise RateLimitExceeded(provider, "rate limit reached, request not sent")
+                    self._condition.wait(min(remaining, max(wait_needed, 0.01)))
+            finally:
+                waiting[lane] -= 1
+                self._condition.notify_all()
+
+    def quota_usage(self):
+        """Returns today's request counts per provider."""
+        return self._quota.usage()
+
+
+# Process-wide instance shared by all outbound API helpers.
+rate_limiter = RateLimiter()
@@ -0,0 +1,159 @@
+import bisect
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from src.errors import ExplorerError, ServiceBusyError
+
+# --- Micro-batching Configuration ---
+MICROBATCH_MAX_SIZE = 32        # Texts per model call; a full batch is sent without waiting
+MICROBATCH_MAX_WAIT_MS = 10     # How long the first text of a batch may wait for company
+MICROBATCH_RESULT_TIMEOUT = 45.0  # Seconds a caller waits for its scores (queueing plus the pool's task timeout)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+WAIT_MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Counts observations into buckets; each bucket counts values up to its bound."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # The last bucket is "above the largest bound"
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self):
+        buckets = {f"<={bound}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets[f">{self.bounds[-1]}"] = self.counts[-1]
+        return {'buckets': buckets, 'count': self.total, 'mean': self.sum / self.total if self.total else 0.0}
+
+
+class SentimentMicroBatcher:
+    """
+    Sits in front of a sentiment pipeline and merges the texts of concurrent
+    callers (all Streamlit sessions share it) into larger batches: a batch is
+    sent once max_batch_size texts are queued or the oldest text has waited
+    max_wait_ms, and each caller gets back exactly its own results.
+
+    It is called like the pipeline. Up to max_in_flight batches are scored at
+    once (one per worker when wrapping a SentimentWorkerPool); while they all
+    are, new texts keep queueing and go out together in the next batch.
+    Histograms of the batch sizes and of the time texts spent waiting are
+    available from stats().
+    """
+
+    def __init__(self, sentiment_pipeline, max_batch_size=MICROBATCH_MAX_SIZE, max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+                 max_in_flight=None, result_timeout=MICROBATCH_RESULT_TIMEOUT):
+        """
+        Args:
+            sentiment_pipeline: The pipeline (or worker pool) doing the actual scoring.
+            max_batch_size (int, optional): Upper bound on texts per model call.
+            max_wait_ms (float, optional): Upper bound on the extra latency added to a text.
+            max_in_flight (int, optional): Batches scored concurrently. Defaults to the
+                                           pipeline's number of workers, or 1.
+            result_timeout (float, optional): Seconds a caller waits for its results
+                                              before getting ServiceBusyError.
+        """
+        self.sentiment_pipeline = sentiment_pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.result_timeout = result_timeout
+        self.max_in_flight = max_in_flight or getattr(sentiment_pipeline, 'workers', 1) or 1
+        self._slots = threading.Semaphore(self.max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="sentiment-batch")
+        # Scores are those of the wrapped pipeline, so they share its cache namespace
+        self.model_id = getattr(sentiment_pipeline, 'model_id', None)
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self._wait_ms = Histogram(WAIT_MS_BUCKETS)
+        self._thread = threading.Thread(target=self._run, name="sentiment-microbatcher", daemon=True)
+        self._thread.start()
+
+    def __call__(self, texts, batch_size=None, truncation=True, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        futures = []
+        for text in texts:
+            future = Future()
+            self._queue.put((text, truncation, time.monotonic(), future))
+            futures.append(future)
+        deadline = time.monotonic() + self.result_timeout
+        try:
+            return [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+        except FutureTimeoutError:
+            raise ServiceBusyError("Sentiment scoring timed out, please try again shortly.")
+
+    def queue_depth(self):
+        """Texts waiting to be batched, plus whatever the wrapped pipeline has queued."""
+        inner_depth = getattr(self.sentiment_pipeline, 'queue_depth', None)
+        return self._queue.qsize() + (inner_depth() if inner_depth else 0)
+
+    def _run(self):
+        while True:
+            # Wait for a free slot first: texts arriving meanwhile join the next batch
+            self._slots.acquire()
+            batch = [self._queue.get()]
+            # Everything already queued goes along, even if the oldest text has
+            # waited past max_wait while the previous batches were scored
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            deadline = batch[0][2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._score_and_release, batch)
+
+    def _score_and_release(self, batch):
+        try:
+            self._score(batch)
+        finally:
+            self._slots.release()
+
+    def _score(self, batch):
+        sent_at = time.monotonic()
+        with self._stats_lock:
+            self._batch_sizes.observe(len(batch))
+            for _, _, queued_at, _ in batch:
+                self._wait_ms.observe((sent_at - queued_at) * 1000)
+
+        # Similar lengths side by side keep padding small
+        batch.sort(key=lambda item: len(item[0]))
+        try:
+            results = list(self.sentiment_pipeline(
+                [text for text, _, _, _ in batch],
+                batch_size=len(batch),
+                truncation=any(truncation for _, truncation, _, _ in batch),
+            ))
+            # A short answer would leave some callers waiting for results that never come
+            if len(results) != len(batch):
+                raise ExplorerError(f"Sentiment model returned {len(results)} results for {len(batch)} texts.")
+        except Exception as e:
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self):
+        """
+        Returns {'batch_size': histogram, 'wait_ms': histogram}, each with per-bucket
+        counts, the number of observations and their mean.
+        """
+        with self._stats_lock:
+            return {'batch_size': self._batch_sizes.snapshot(), 'wait_ms': self._wait_ms.snapshot()}
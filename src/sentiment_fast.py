@@ -0,0 +1,74 @@
+import os
+import pickle
+
+# --- Fast Model Configuration ---
+FAST_SENTIMENT_MODEL_PATH = os.path.join("models", "fast_sentiment.pkl")
+FAST_SENTIMENT_MODEL_ID = "hashed-linear-sst2-distilled"
+HASHING_FEATURES = 2 ** 18
+HASHING_NGRAM_RANGE = (1, 2)
+
+
+def make_vectorizer():
+    """The stateless feature extractor shared by training and serving."""
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(
+        n_features=HASHING_FEATURES, ngram_range=HASHING_NGRAM_RANGE,
+        alternate_sign=False, norm='l2', lowercase=True,
+    )
+
+
+def train_fast_model(texts, labels, output_path=FAST_SENTIMENT_MODEL_PATH):
+    """
+    Fits a logistic regression on hashed word and bigram features and saves it.
+    Args:
+        texts (list): Review strings.
+        labels (list): One label per text, e.g. the DistilBERT labels it should imitate.
+        output_path (str, optional): Where the pickled model is written.
+    Returns:
+        FastSentimentModel: The trained model.
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    classifier = LogisticRegression(max_iter=1000, C=4.0)
+    classifier.fit(make_vectorizer().transform(texts), labels)
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, 'wb') as f:
+        pickle.dump({'model_id': FAST_SENTIMENT_MODEL_ID, 'classifier': classifier}, f)
+    return FastSentimentModel(output_path)
+
+
+class FastSentimentModel:
+    """
+    Very cheap sentiment scorer (a linear model over hashed n-grams, well under a
+    millisecond per review) with the same call interface as the transformers pipeline.
+    Results carry 'model' so callers can tell its labels from the transformer's.
+    """
+
+    def __init__(self, model_path=FAST_SENTIMENT_MODEL_PATH):
+        with open(model_path, 'rb') as f:
+            saved = pickle.load(f)
+        self.model_id = saved['model_id']
+        self.classifier = saved['classifier']
+        self.vectorizer = make_vectorizer()
+
+    def __call__(self, texts, batch_size=None, truncation=True, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        if not texts:
+            return []
+        probabilities = self.classifier.predict_proba(self.vectorizer.transform(texts))
+        results = []
+        for row in probabilities:
+            best = int(row.argmax())
+            results.append({'label': str(self.classifier.classes_[best]), 'score': float(row[best]), 'model': self.model_id})
+        return results
+
+
+def load_fast_sentiment_model(model_path=FAST_SENTIMENT_MODEL_PATH):
+    """Returns the fast model, or None if it has not been trained (see train_fast_sentiment.py)."""
+    if not os.path.exists(model_path):
+        return None
+    return FastSentimentModel(model_path)
@@ -1,73 +1,314 @@
 # sentiment_model.py
 
-import streamlit as st
-from transformers import pipeline
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
+
+from src.disk_cache import CACHE_DIR, DiskCache
+from src.errors import ExplorerError
+
+# --- Model Configuration ---
+# Using a model fine-tuned on the Stanford Sentiment Treebank v2 (SST-2)
+SENTIMENT_MODEL_ID = "distilbert-base-uncased-finetuned-sst-2-english"
+# EXPLORER_SENTIMENT_BACKEND selects how the model is run:
+#   pytorch   - the transformers pipeline (default)
+#   onnx-int8 - an int8-quantized ONNX export served by ONNX Runtime (CPU only, needs onnxruntime)
+SENTIMENT_BACKEND = os.environ.get("EXPLORER_SENTIMENT_BACKEND", "pytorch")
+# With EXPLORER_SENTIMENT_WORKERS > 0 the model runs in that many worker processes
+# (see src/sentiment_pool.py) instead of inside the app process.
+SENTIMENT_WORKERS = int(os.environ.get("EXPLORER_SENTIMENT_WORKERS", "0"))
+# Reviews from concurrent sessions are merged into one model call if they arrive within
+# this many milliseconds of each other (see src/sentiment_batcher.py); 0 disables it.
+SENTIMENT_MICROBATCH_MS = float(os.environ.get("EXPLORER_SENTIMENT_MICROBATCH_MS", "10"))
+# If a fast fallback model has been trained (train_fast_sentiment.py), calls that would take
+# the transformer longer than this are scored by it instead (see src/sentiment_router.py).
+SENTIMENT_LATENCY_BUDGET_MS = float(os.environ.get("EXPLORER_SENTIMENT_LATENCY_BUDGET_MS", "800"))
+
+# --- Batching Configuration ---
+SENTIMENT_BATCH_SIZE = 16  # Reviews per forward pass; larger batches help on CPU until memory runs out
+
+# --- Sentiment Cache Configuration ---
+# Scores are keyed by model and review text, so they are shared by every session and
+# process and never expire; the size cap evicts the least recently used reviews.
+SENTIMENT_CACHE_PATH = os.path.join(CACHE_DIR, "sentiment_cache.sqlite")
+SENTIMENT_CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+sentiment_cache = DiskCache(SENTIMENT_CACHE_PATH, max_bytes=SENTIMENT_CACHE_MAX_BYTES)
 
 # --- Load Pre-trained Sentiment Analysis Model ---
-@st.cache_resource
-def load_sentiment_model():
+@lru_cache(maxsize=None)
+def load_sentiment_model(backend=SENTIMENT_BACKEND):
     """
     Loads a pre-trained sentiment analysis model and tokenizer using Hugging Face transformers.
+    The pipeline is loaded once per process and shared by all callers.
+    Args:
+        backend (str, optional): 'pytorch' or 'onnx-int8'. Both return a callable with the
+                                 same interface as the transformers pipeline.
     """
-    # Using a model fine-tuned on the Stanford Sentiment Treebank v2 (SST-2)
+    if backend == 'onnx-int8':
+        from src.sentiment_onnx import load_onnx_sentiment_model
+        return load_onnx_sentiment_model(SENTIMENT_MODEL_ID)
+    if backend != 'pytorch':
+        raise ValueError(f"Unknown sentiment backend: {backend}")
+    from transformers import pipeline  # Imported here: pulling in transformers/torch takes seconds
+
     # This model classifies text as 'POSITIVE' or 'NEGATIVE'.
-    model = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+    model = pipeline("sentiment-analysis", model=SENTIMENT_MODEL_ID)
     return model
 
+
+class SentimentModelWarmup:
+    """
+    Loads the sentiment model in a background thread, so that pages render while
+    transformers/torch are imported and the weights are loaded. Callers check
+    is_ready() and show a placeholder until then. Time spent in the import and
+    load phases is kept in timings.
+
+    With workers > 0 the model is loaded in a worker pool instead, and the
+    pool (which is called like a pipeline) is what get() returns. With
+    microbatch_ms > 0 the model is wrapped in a SentimentMicroBatcher, and if
+    the fast model exists, in a SentimentRouter choosing between the two.
+    """
+
+    def __init__(self, backend=SENTIMENT_BACKEND, workers=SENTIMENT_WORKERS, microbatch_ms=SENTIMENT_MICROBATCH_MS):
+        self.backend = backend
+        self.workers = workers
+        self.microbatch_ms = microbatch_ms
+        self.timings = {}  # phase -> seconds ('import' and 'load', or 'workers')
+        self.error = None
+        self._pipeline = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts loading the model unless that has already started."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sentiment-warmup", daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            start = time.perf_counter()
+            if self.workers:
+                from src.sentiment_pool import SentimentWorkerPool
+                sentiment_pipeline = SentimentWorkerPool(self.workers, self.backend).warm_up()
+                self.timings['workers'] = time.perf_counter() - start
+            else:
+                if self.backend == 'onnx-int8':
+                    import onnxruntime  # noqa: F401
+                else:
+                    import torch  # noqa: F401
+                import transformers  # noqa: F401
+                loaded_imports = time.perf_counter()
+                self.timings['import'] = loaded_imports - start
+                sentiment_pipeline = load_sentiment_model(self.backend)
+                self.timings['load'] = time.perf_counter() - loaded_imports
+            if self.microbatch_ms > 0:
+                from src.sentiment_batcher import SentimentMicroBatcher
+                sentiment_pipeline = SentimentMicroBatcher(sentiment_pipeline, max_wait_ms=self.microbatch_ms)
+            from src.sentiment_fast import load_fast_sentiment_model
+            fast_model = load_fast_sentiment_model()
+            if fast_model is not None:
+                from src.sentiment_router import SentimentRouter
+                sentiment_pipeline = SentimentRouter(
+                    sentiment_pipeline, fast_model, latency_budget_ms=SENTIMENT_LATENCY_BUDGET_MS
+                )
+            self._pipeline = sentiment_pipeline
+            print(f"Sentiment model ready: {self.timing_report()}")
+        except Exception as e:
+            self.error = e
+            print(f"Error loading the sentiment model: {e}")
+        finally:
+            self._ready.set()
+
+    def is_ready(self):
+        """True once loading has finished (successfully or not)."""
+        return self._ready.is_set()
+
+    def get(self, timeout=None):
+        """
+        Returns the loaded pipeline, waiting up to timeout seconds (None waits forever).
+        Returns None if the model is still loading or failed to load (see error).
+        """
+        self._ready.wait(timeout)
+        return self._pipeline
+
+    def timing_report(self):
+        """One-line summary of the import and load phases, e.g. for logs."""
+        phases = ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in self.timings.items())
+        return f"{self.backend} backend: {phases or 'not loaded'}"
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def start_sentiment_warmup():
+    """Starts (once per process) loading the sentiment model in the background and returns the warmup."""
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = SentimentModelWarmup().start()
+        return _warmup
+
+
+def pipeline_model_id(sentiment_pipeline):
+    """The ID scores of this pipeline are cached under (backends that change the scores have their own)."""
+    return getattr(sentiment_pipeline, 'model_id', None) or SENTIMENT_MODEL_ID
+
+# --- Batched Scoring ---
+def sentiment_cache_key(text, model_id=SENTIMENT_MODEL_ID):
+    """Content address of a review's score: the same text scored by the same model shares one entry."""
+    return hashlib.sha256(f"{model_id}\0{text}".encode('utf-8')).hexdigest()
+
+
+def score_review_texts(sentiment_pipeline, texts, batch_size=SENTIMENT_BATCH_SIZE, model_id=None, use_cache=True):
+    """
+    Runs the sentiment pipeline over many texts in batches.
+    Texts already scored by this model are answered from the sentiment cache;
+    only the rest go through the model. Those are sorted by length before
+    batching so each batch pads to a similar length, and are truncated to the
+    model's maximum input length.
+    Args:
+        sentiment_pipeline: The loaded sentiment analysis pipeline.
+        texts (list): Review strings.
+        batch_size (int, optional): Number of texts per forward pass.
+        model_id (str, optional): Identifies the model in the cache keys (default: pipeline_model_id).
+        use_cache (bool, optional): Read from and write to the sentiment cache. Defaults to True.
+    Returns:
+        list: One (sentiment, error) pair per text, in the original order. sentiment is
+              the pipeline's {'label', 'score'} dict, or None with an error message.
+    Raises:
+        ExplorerError: If the model itself is unavailable (e.g. the worker pool is busy).
+    """
+    model_id = model_id or pipeline_model_id(sentiment_pipeline)
+    results = [None] * len(texts)
+    misses = []
+    for i, text in enumerate(texts):
+        cached = sentiment_cache.get(sentiment_cache_key(text, model_id)) if use_cache else None
+        if cached is not None:
+            results[i] = (cached, None)
+        else:
+            misses.append(i)
+
+    order = sorted(misses, key=lambda i: len(texts[i]))
+    # A worker pool scores the batches of one call in parallel, so hand it one batch per worker
+    chunk_size = batch_size * getattr(sentiment_pipeline, 'workers', 1)
+    for start in range(0, len(order), chunk_size):
+        batch = order[start:start + chunk_size]
+        try:
+            sentiments = sentiment_pipeline(
+                [texts[i] for i in batch], batch_size=batch_size, truncation=True
+            )
+            for i, sentiment in zip(batch, sentiments):
+                results[i] = (sentiment, None)
+        except ExplorerError:
+            raise  # The model is unavailable (e.g. worker pool busy); retrying review by review won't help
+        except Exception:
+            # Score this batch one by one so a single bad review does not fail the others
+            for i in batch:
+                try:
+                    results[i] = (sentiment_pipeline(texts[i], truncation=True)[0], None)
+                except Exception as e:
+                    # Catch the error (e.g., 'languageCode' error)
+                    results[i] = (None, f"Could not analyze sentiment for review: '{texts[i][:50]}...' Error: {e}")
+
+    if use_cache:
+        for i in misses:
+            sentiment, _ = results[i]
+            if sentiment is not None:
+                # Labels from a fallback model are cached under that model, so they never
+                # stand in for the transformer's label on a later lookup
+                sentiment_cache.set(sentiment_cache_key(texts[i], sentiment.get('model') or model_id), sentiment)
+    return results
+
+
+def _review_text_and_author(review):
+    # CRUCIAL FIX: Access the nested 'text' field within the 'text' dictionary
+    review_text_content = review.get('text', {}).get('text', '') # Extract only the string content
+    author_name = review.get('authorAttribution', {}).get('displayName', 'Anonymous') # Extract author name
+    return review_text_content, author_name
+
+
 # --- Aggregate Sentiment Function ---
-def get_place_reviews_with_sentiment(sentiment_pipeline, place_details_reviews):
+def get_place_reviews_with_sentiment(sentiment_pipeline, place_details_reviews, batch_size=SENTIMENT_BATCH_SIZE, use_cache=True):
     """
     Analyzes the sentiment of a list of reviews using the ML model
     and provides an aggregated summary, including individual results.
+    All reviews are scored together in batches, and only reviews missing from the
+    sentiment cache are run through the model (see score_review_texts).
     Args:
         sentiment_pipeline: The loaded sentiment analysis pipeline.
         place_details_reviews (list): A list of review dictionaries from the Google Places API.
                                       Each dict is expected to have a 'text' key, which itself
                                       is a dictionary with 'text' and 'languageCode',
                                       and an 'authorAttribution' key which has a 'displayName'.
+        batch_size (int, optional): Number of reviews per forward pass.
+        use_cache (bool, optional): Read from and write to the sentiment cache. Defaults to True.
     Returns:
         dict: A dictionary containing the aggregated sentiment counts
               (positive, negative, total analyzed) and an overall category.
               Includes 'individual_results' for each review's sentiment,
-              now also containing the author's display name.
+              now also containing the author's display name and, if the review
+              could not be analyzed, an 'error' message (with 'sentiment' None).
               Returns None if no valid reviews are provided.
     """
     if not place_details_reviews:
         return None
+    return get_reviews_sentiment_for_places(
+        sentiment_pipeline, {None: place_details_reviews}, batch_size=batch_size, use_cache=use_cache
+    )[None]
+
+
+def get_reviews_sentiment_for_places(sentiment_pipeline, reviews_by_place, batch_size=SENTIMENT_BATCH_SIZE, use_cache=True):
+    """
+    Scores the reviews of several places in one batched pass and summarizes each place.
+    Args:
+        sentiment_pipeline: The loaded sentiment analysis pipeline.
+        reviews_by_place (dict): place_id -> list of review dictionaries (as for get_place_reviews_with_sentiment).
+        batch_size (int, optional): Number of reviews per forward pass.
+        use_cache (bool, optional): Read from and write to the sentiment cache. Defaults to True.
+    Returns:
+        dict: place_id -> summary dict as returned by get_place_reviews_with_sentiment
+              (None for places without reviews).
+    """
+    entries = []  # (place_id, review text, author)
+    for place_id, reviews in reviews_by_place.items():
+        for review in reviews or []:
+            review_text_content, author_name = _review_text_and_author(review)
+            if review_text_content: # Ensure there is actual text content to analyze
+                entries.append((place_id, review_text_content, author_name))
+
+    scores = score_review_texts(
+        sentiment_pipeline, [text for _, text, _ in entries], batch_size=batch_size, use_cache=use_cache
+    )
+
+    individual_results_by_place = {place_id: [] for place_id in reviews_by_place}
+    for (place_id, review_text_content, author_name), (sentiment, error) in zip(entries, scores):
+        # Store the original review text (from Google API), author, and the sentiment result
+        individual_results_by_place[place_id].append({
+            'review': review_text_content, # Store the extracted text content
+            'author': author_name,
+            'sentiment': sentiment,
+            'error': error
+        })
+
+    return {
+        place_id: _summarize_sentiment(individual_results) if reviews_by_place[place_id] else None
+        for place_id, individual_results in individual_results_by_place.items()
+    }
 
-    positive_count = 0
-    negative_count = 0
-    total_analyzed = 0
-    individual_results = []
-
-    for review in place_details_reviews:
-        # CRUCIAL FIX: Access the nested 'text' field within the 'text' dictionary
-        review_text_content = review.get('text', {}).get('text', '') # Extract only the string content
-        author_name = review.get('authorAttribution', {}).get('displayName', 'Anonymous') # Extract author name
-        
-        if review_text_content: # Ensure there is actual text content to analyze
-            sentiment = None
-            try:
-                # Attempt to get sentiment for each review using only the text content
-                sentiment = sentiment_pipeline(review_text_content)[0] # Pipeline returns list of dicts
-                total_analyzed += 1
-                if sentiment['label'] == 'POSITIVE':
-                    positive_count += 1
-                elif sentiment['label'] == 'NEGATIVE':
-                    negative_count += 1
-            except Exception as e:
-                # Catch the error (e.g., 'languageCode' error)
-                st.warning(f"Could not analyze sentiment for review: '{review_text_content[:50]}...' Error: {e}")
-                # If sentiment analysis fails, we still want to record the original review text
-                # but its sentiment will be 'None' or 'N/A' in the display logic.
-
-            # Store the original review text (from Google API), author, and the sentiment result
-            individual_results.append({
-                'review': review_text_content, # Store the extracted text content
-                'author': author_name,
-                'sentiment': sentiment
-            })
 
+def _summarize_sentiment(individual_results):
+    analyzed = [r['sentiment'] for r in individual_results if r['sentiment'] is not None]
+    positive_count = sum(1 for sentiment in analyzed if sentiment['label'] == 'POSITIVE')
+    negative_count = sum(1 for sentiment in analyzed if sentiment['label'] == 'NEGATIVE')
+    total_analyzed = len(analyzed)
 
     overall_category = "Neutral 😐"
     if total_analyzed > 0:
@@ -0,0 +1,119 @@
+import json
+import os
+
+import numpy as np
+
+from src.disk_cache import CACHE_DIR
+
+# --- ONNX Backend Configuration ---
+ONNX_MODEL_DIR = os.path.join(CACHE_DIR, "sentiment_onnx")
+ONNX_OPSET = 14
+FLOAT_MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+LABELS_FILE = "labels.json"
+
+
+def export_quantized_model(model_id, output_dir=ONNX_MODEL_DIR):
+    """
+    Exports a Hugging Face sequence classification model to ONNX and applies
+    dynamic int8 quantization to its weights. Needs torch, transformers and
+    onnxruntime; only runs once, the serving side only needs onnxruntime.
+    Args:
+        model_id (str): Hugging Face model ID, e.g. "distilbert-base-uncased-finetuned-sst-2-english".
+        output_dir (str, optional): Directory receiving the models, tokenizer and labels.
+    Returns:
+        str: Path of the quantized model.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    model = AutoModelForSequenceClassification.from_pretrained(model_id)
+    model.eval()
+
+    sample = tokenizer(["An example review to trace the graph."], return_tensors="pt")
+    float_path = os.path.join(output_dir, FLOAT_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample['input_ids'], sample['attention_mask']),
+            float_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'},
+            },
+            opset_version=ONNX_OPSET,
+        )
+
+    quantized_path = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+    quantize_dynamic(float_path, quantized_path, weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, LABELS_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'model_id': model_id, 'id2label': model.config.id2label}, f)
+    return quantized_path
+
+
+class OnnxSentimentPipeline:
+    """
+    Drop-in replacement for the transformers sentiment-analysis pipeline, running
+    the int8-quantized ONNX export with ONNX Runtime on CPU. Called with a string
+    or a list of strings, it returns a list of {'label', 'score'} dicts.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, intra_op_threads=None):
+        """
+        Args:
+            model_dir (str, optional): Directory written by export_quantized_model.
+            intra_op_threads (int, optional): Threads ONNX Runtime may use per call (default: all cores).
+        """
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(model_dir, LABELS_FILE), encoding='utf-8') as f:
+            labels = json.load(f)
+        self.id2label = {int(i): label for i, label in labels['id2label'].items()}
+        # Scores differ slightly from the PyTorch model, so they are cached under their own ID
+        self.model_id = f"{labels['model_id']}:onnx-int8"
+
+        options = onnxruntime.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, QUANTIZED_MODEL_FILE), options, providers=['CPUExecutionProvider']
+        )
+
+    def __call__(self, texts, batch_size=16, truncation=True, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        results = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=truncation, return_tensors='np'
+            )
+            logits = self.session.run(
+                ['logits'],
+                {
+                    'input_ids': encoded['input_ids'].astype(np.int64),
+                    'attention_mask': encoded['attention_mask'].astype(np.int64),
+                },
+            )[0]
+            probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            for row in probabilities:
+                label_id = int(row.argmax())
+                results.append({'label': self.id2label[label_id], 'score': float(row[label_id])})
+        return results
+
+
+def load_onnx_sentiment_model(model_id, model_dir=ONNX_MODEL_DIR):
+    """Loads the quantized ONNX pipeline, exporting the model first if it is not there yet."""
+    if not os.path.exists(os.path.join(model_dir, QUANTIZED_MODEL_FILE)):
+        export_quantized_model(model_id, model_dir)
+    return OnnxSentimentPipeline(model_dir)
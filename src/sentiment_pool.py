@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+import threading
+import time
+
+from src.errors import ServiceBusyError
+from src.sentiment_model import SENTIMENT_BACKEND, SENTIMENT_BATCH_SIZE, SENTIMENT_MODEL_ID, load_sentiment_model
+
+# --- Worker Pool Configuration ---
+SENTIMENT_POOL_MAX_PENDING_PER_WORKER = 4  # Queued batches per worker before callers are turned away
+SENTIMENT_POOL_ADMISSION_TIMEOUT = 2.0     # Seconds a caller may wait for room in the queue
+SENTIMENT_POOL_TASK_TIMEOUT = 30.0         # Seconds a request may take before the pool is recycled
+SENTIMENT_WORKER_MAX_TASKS = 200           # Batches a worker scores before it is replaced (bounds leaks)
+
+_worker_pipeline = None
+
+
+def _init_worker(backend, threads_per_worker):
+    """Runs once in each worker process: limits its threads and loads the model."""
+    global _worker_pipeline
+    # Must be set before torch is imported, or every worker grabs every core
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads_per_worker))
+    os.environ.setdefault("MKL_NUM_THREADS", str(threads_per_worker))
+    _worker_pipeline = load_sentiment_model(backend)
+
+
+def _score_batch(texts, batch_size, truncation):
+    return _worker_pipeline(texts, batch_size=batch_size, truncation=truncation)
+
+
+class SentimentWorkerPool:
+    """
+    Runs the sentiment model in a pool of worker processes, each holding its
+    own copy of the model, so scoring neither competes with the Streamlit
+    sessions for the GIL nor runs torch threads in the app process.
+
+    The pool is called like the transformers pipeline. Large requests are
+    split into batches that are scored in parallel. The number of queued
+    batches is bounded (callers get ServiceBusyError instead of queueing
+    forever), each request has a timeout, and workers are replaced after
+    SENTIMENT_WORKER_MAX_TASKS batches or when a request times out.
+    """
+
+    def __init__(self, workers, backend=SENTIMENT_BACKEND, max_pending=None,
+                 task_timeout=SENTIMENT_POOL_TASK_TIMEOUT, max_tasks_per_worker=SENTIMENT_WORKER_MAX_TASKS):
+        """
+        Args:
+            workers (int): Number of worker processes.
+            backend (str, optional): Model backend loaded by each worker ('pytorch' or 'onnx-int8').
+            max_pending (int, optional): Batches that may be queued or running at once.
+            task_timeout (float, optional): Seconds a call may take before it fails.
+            max_tasks_per_worker (int, optional): Batches after which a worker process is replaced.
+        """
+        self.workers = workers
+        self.backend = backend
+        self.max_pending = max_pending or workers * SENTIMENT_POOL_MAX_PENDING_PER_WORKER
+        self.task_timeout = task_timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        # Same cache namespace as the in-process backend of the same kind
+        self.model_id = SENTIMENT_MODEL_ID if backend == 'pytorch' else f"{SENTIMENT_MODEL_ID}:{backend}"
+        self._lock = threading.Lock()
+        self._start_pool()
+
+    def _start_pool(self):
+        threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+        # spawn: forking a process that already runs Streamlit (and maybe torch) threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        self._pool = context.Pool(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(self.backend, threads_per_worker),
+            maxtasksperchild=self.max_tasks_per_worker,
+        )
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._queued_texts = 0
+
+    def queue_depth(self):
+        """Texts currently queued or being scored (the same unit as SentimentMicroBatcher.queue_depth)."""
+        with self._lock:
+            return self._queued_texts
+
+    def _batch_done(self, slots, pool, size):
+        slots.release()
+        with self._lock:
+            if pool is self._pool:  # Counters of a recycled pool are gone already
+                self._queued_texts -= size
+
+    def recycle(self, pool=None):
+        """
+        Kills all workers (e.g. one is stuck) and starts a fresh pool.
+        With pool given, only does so if that pool is still the current one, so
+        callers that timed out on an already recycled pool leave its successor alone.
+        """
+        with self._lock:
+            old_pool = self._pool
+            if pool is not None and pool is not old_pool:
+                return
+            self._start_pool()
+        # Outside the lock: terminate() waits for the result thread, which may be in _batch_done
+        old_pool.terminate()
+
+    def warm_up(self):
+        """Blocks until every worker has loaded the model. Returns the pool."""
+        with self._lock:
+            pool = self._pool
+        results = [pool.apply_async(_score_batch, (["warm up"], 1, True)) for _ in range(self.workers)]
+        for result in results:
+            result.get()
+        return self
+
+    def __call__(self, texts, batch_size=SENTIMENT_BATCH_SIZE, truncation=True, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        deadline = time.monotonic() + self.task_timeout
+        with self._lock:
+            pool, slots = self._pool, self._slots
+
+        pending = []
+        try:
+            for start in range(0, len(texts), batch_size):
+                if not slots.acquire(timeout=SENTIMENT_POOL_ADMISSION_TIMEOUT):
+                    raise ServiceBusyError("Sentiment workers are busy, please try again shortly.")
+                batch = texts[start:start + batch_size]
+                with self._lock:
+                    self._queued_texts += len(batch)
+                pending.append(pool.apply_async(
+                    _score_batch, (batch, batch_size, truncation),
+                    callback=lambda _, size=len(batch): self._batch_done(slots, pool, size),
+                    error_callback=lambda _, size=len(batch): self._batch_done(slots, pool, size),
+                ))
+
+            results = []
+            for result in pending:
+                results.extend(result.get(timeout=max(0.0, deadline - time.monotonic())))
+            return results
+        except multiprocessing.TimeoutError:
+            # A worker is stuck or overloaded: replace them all rather than leave it holding a slot
+            print(f"Sentiment request timed out after {self.task_timeout}s, recycling the worker pool")
+            self.recycle(pool)
+            raise ServiceBusyError("Sentiment scoring timed out, please try again shortly.")
+
+    def close(self):
+        with self._lock:
+            pool = self._pool
+        pool.close()
+        pool.join()
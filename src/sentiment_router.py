@@ -0,0 +1,99 @@
+import threading
+import time
+
+from src.errors import ServiceBusyError
+
+# --- Routing Configuration ---
+ROUTER_LATENCY_BUDGET_MS = 800      # Longest the transformer may be expected to take for one call
+ROUTER_MAX_QUEUE_DEPTH = 16         # Texts already queued or being scored before the fast model takes over
+ROUTER_INITIAL_MS_PER_TOKEN = 0.25  # DistilBERT on a few CPU cores; refined from observed calls
+ROUTER_EWMA_ALPHA = 0.2
+CHARS_PER_TOKEN = 4                 # Rough WordPiece average for English reviews
+MAX_TOKENS_PER_TEXT = 512           # Longer texts are truncated by the model
+
+
+def estimate_tokens(text):
+    return min(MAX_TOKENS_PER_TEXT, len(text) // CHARS_PER_TOKEN + 2)
+
+
+class SentimentRouter:
+    """
+    Chooses per call between the transformer pipeline and a fast fallback model,
+    keeping the time spent scoring reviews bounded under load:
+      - the fast model is used when the transformer's estimated cost for the call
+        (tokens x observed milliseconds per token) exceeds the latency budget, or
+        when more than max_queue_depth texts are queued for the transformer;
+      - the transformer is used otherwise, and its timings refine the estimate;
+      - if the transformer turns the call away anyway (ServiceBusyError from a
+        full or stuck worker pool), the fast model answers instead.
+    Called like the pipeline; every result carries 'model', the ID of the model
+    that produced its label.
+    """
+
+    def __init__(self, primary, fast, latency_budget_ms=ROUTER_LATENCY_BUDGET_MS, max_queue_depth=ROUTER_MAX_QUEUE_DEPTH,
+                 primary_model_id=None):
+        """
+        Args:
+            primary: The transformer pipeline (or a batcher/pool wrapping it).
+            fast: The fast model, e.g. FastSentimentModel.
+            latency_budget_ms (float, optional): Estimated transformer time above which the fast model is used.
+            max_queue_depth (int, optional): Texts queued for the transformer above which the fast model is used.
+            primary_model_id (str, optional): ID recorded for transformer labels.
+        """
+        from src.sentiment_model import pipeline_model_id
+
+        self.primary = primary
+        self.fast = fast
+        self.latency_budget_ms = latency_budget_ms
+        self.max_queue_depth = max_queue_depth
+        # Cache lookups use the transformer's ID, so reviews scored by the fast model
+        # are scored again by the transformer once there is capacity
+        self.model_id = primary_model_id or pipeline_model_id(primary)
+        self._lock = threading.Lock()
+        self._ms_per_token = ROUTER_INITIAL_MS_PER_TOKEN
+        self._routed = {'primary': 0, 'fast': 0, 'busy_fallback': 0}
+
+    def _queue_depth(self):
+        queue_depth = getattr(self.primary, 'queue_depth', None)
+        return queue_depth() if queue_depth else 0
+
+    def choose(self, texts):
+        """Returns ('primary' or 'fast', estimated transformer milliseconds) for a call."""
+        tokens = sum(estimate_tokens(text) for text in texts)
+        with self._lock:
+            estimated_ms = tokens * self._ms_per_token
+        if estimated_ms > self.latency_budget_ms or self._queue_depth() > self.max_queue_depth:
+            return 'fast', estimated_ms
+        return 'primary', estimated_ms
+
+    def __call__(self, texts, batch_size=None, truncation=True, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        route, _ = self.choose(texts)
+        with self._lock:
+            self._routed[route] += 1
+
+        if route == 'fast':
+            return self.fast(texts, batch_size=batch_size, truncation=truncation)
+
+        start = time.perf_counter()
+        try:
+            results = self.primary(texts, batch_size=batch_size, truncation=truncation, **kwargs)
+        except ServiceBusyError:
+            with self._lock:
+                self._routed['busy_fallback'] += 1
+            return self.fast(texts, batch_size=batch_size, truncation=truncation)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        tokens = sum(estimate_tokens(text) for text in texts)
+        if tokens:
+            with self._lock:
+                self._ms_per_token += ROUTER_EWMA_ALPHA * (elapsed_ms / tokens - self._ms_per_token)
+        return [{**result, 'model': self.model_id} for result in results]
+
+    def stats(self):
+        """
+        Calls routed to each model ('busy_fallback': transformer calls that ended up
+        on the fast model) and the current transformer cost estimate.
+        """
+        with self._lock:
+            return {'routed': dict(self._routed), 'ms_per_token': self._ms_per_token}
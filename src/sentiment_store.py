@@ -0,0 +1,42 @@
+import os
+
+from src.disk_cache import CACHE_DIR, DiskCache
+from src.sentiment_fast import FAST_SENTIMENT_MODEL_ID
+
+# --- Sentiment Aggregates Store Configuration ---
+# Per-place review sentiment summaries, written by prescore_reviews.py and by the
+# details page, read by the details page before it scores anything itself.
+SENTIMENT_AGGREGATES_PATH = os.path.join(CACHE_DIR, "sentiment_aggregates.sqlite")
+SENTIMENT_AGGREGATES_MAX_BYTES = 100 * 1024 * 1024
+SENTIMENT_AGGREGATES_TTL = 7 * 24 * 60 * 60  # Reviews change slowly; re-score weekly
+
+sentiment_aggregates = DiskCache(
+    SENTIMENT_AGGREGATES_PATH, max_bytes=SENTIMENT_AGGREGATES_MAX_BYTES, default_ttl=SENTIMENT_AGGREGATES_TTL
+)
+
+
+def _aggregate_key(place_id):
+    return f"place:{place_id}"
+
+
+def get_place_sentiment(place_id):
+    """Returns the stored sentiment summary of a place (as from get_place_reviews_with_sentiment), or None."""
+    return sentiment_aggregates.get(_aggregate_key(place_id))
+
+
+def has_fast_model_labels(summary):
+    """True if any review of the summary was labelled by the fast fallback model."""
+    return any(
+        (result.get('sentiment') or {}).get('model') == FAST_SENTIMENT_MODEL_ID
+        for result in (summary or {}).get('individual_results', [])
+    )
+
+
+def save_place_sentiment(place_id, summary):
+    """
+    Stores the sentiment summary of a place. Summaries without analyzed reviews are
+    not kept, nor are those with fast-model labels: the place should be scored by the
+    transformer once it has capacity.
+    """
+    if summary and summary.get('total_analyzed', 0) > 0 and not has_fast_model_labels(summary):
+        sentiment_aggregates.set(_aggregate_key(place_id), summary)
@@ -0,0 +1,92 @@
+import threading
+
+from src.rate_limiter import RateLimitExceeded, rate_limiter
+
+
+class _InFlightCall:
+    def __init__(self, lane):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.lane = lane  # Rate limiter lane of the thread running the call
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a given key is in
+    flight, any other thread asking for the same key waits for it and shares
+    its result (or its exception) instead of issuing a duplicate request.
+
+    Streamlit serves every session from a thread in the same process, so one
+    shared instance de-duplicates requests across all users.
+
+    A call running in a lower-priority rate limiter lane (e.g. a prefetch) fails
+    fast when tokens are short; callers from a higher-priority lane that joined
+    it then run the call again in their own lane instead of sharing that error.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counters = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) unless an identical call is already running.
+        Args:
+            key (tuple): Identifies the call. The first element is used as the
+                         namespace for the counters (e.g. "places_text_search").
+            fn (callable): The function performing the request.
+        Returns:
+            Whatever fn returns. Coalesced callers receive the very same object,
+            so treat it as read-only.
+        """
+        namespace = key[0] if isinstance(key, tuple) and key else key
+        lane = rate_limiter.current_lane()
+        with self._lock:
+            counters = self._counters.setdefault(namespace, {'calls': 0, 'executed': 0, 'coalesced': 0})
+            counters['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                counters['coalesced'] += 1
+                is_leader = False
+            else:
+                call = _InFlightCall(lane)
+                self._calls[key] = call
+                counters['executed'] += 1
+                is_leader = True
+
+        if not is_leader:
+            call.done.wait()
+            if isinstance(call.error, RateLimitExceeded) and call.lane > lane:
+                return self.do(key, fn, *args, **kwargs)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        """
+        Returns a snapshot of the counters per namespace:
+        {'calls': total requests, 'executed': calls that really ran, 'coalesced': calls that piggybacked}.
+        """
+        with self._lock:
+            return {namespace: dict(counters) for namespace, counters in self._counters.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            self._counters = {}
+
+
+# Process-wide instance shared by all outbound API helpers.
+api_calls = SingleFlight()
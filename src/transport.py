@@ -0,0 +1,214 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import requests
+
+# --- Transport Configuration ---
+# EXPLORER_TRANSPORT selects how outbound HTTP requests are made:
+#   live   - send requests to the real services (default)
+#   record - send requests to the real services and save every response as a fixture
+#   replay - answer requests from saved fixtures only, without any network access
+TRANSPORT_MODE = os.environ.get("EXPLORER_TRANSPORT", "live")
+FIXTURES_DIR = os.environ.get("EXPLORER_FIXTURES_DIR", "fixtures")
+# Send live requests to e.g. the local stand-in server (standin_server.py) instead of
+# the real hosts: https://places.googleapis.com/v1/x becomes {override}/places.googleapis.com/v1/x
+# (a path in the override is kept, so http://proxy/standin/ gives http://proxy/standin/places...)
+API_HOST_OVERRIDE = os.environ.get("EXPLORER_API_HOST_OVERRIDE")
+REQUEST_TIMEOUT = 15
+
+# Query parameters and headers that carry credentials; they never end up in fixtures.
+SECRET_PARAMS = {'key', 'appid'}
+KEYED_HEADERS = ['X-Goog-FieldMask']  # Headers that change the response and so are part of the key
+
+
+def fixture_key(method, url, params=None, headers=None, data=None):
+    """
+    Returns a stable identifier for a request, ignoring credentials.
+    The local stand-in server uses the same function to find the fixture to serve.
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update({k: str(v) for k, v in (params or {}).items()})
+    query = sorted((k, v) for k, v in query.items() if k not in SECRET_PARAMS)
+    headers = headers or {}
+    keyed_headers = {name: headers[name] for name in KEYED_HEADERS if name in headers}
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    canonical = json.dumps(
+        [method.upper(), f"{parts.netloc}{parts.path}", query, keyed_headers, data or ""],
+        sort_keys=True,
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def fixture_path(fixtures_dir, url, key):
+    return os.path.join(fixtures_dir, urlsplit(url).netloc, f"{key}.json")
+
+
+def _is_text(content_type):
+    return content_type.startswith('text/') or 'json' in content_type or 'xml' in content_type
+
+
+class ReplayResponse:
+    """The subset of requests.Response used by the app, built from a fixture."""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class LiveTransport:
+    """
+    Sends requests to the network with the requests library. Requests without a
+    timeout of their own get the transport's default timeout.
+    """
+
+    def __init__(self, host_override=API_HOST_OVERRIDE, timeout=REQUEST_TIMEOUT):
+        self.host_override = host_override.rstrip('/') if host_override else None
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def _target_url(self, url):
+        if not self.host_override:
+            return url
+        parts = urlsplit(url)
+        override = urlsplit(self.host_override)
+        path = f"{override.path.rstrip('/')}/{parts.netloc}{parts.path}"
+        return urlunsplit((override.scheme, override.netloc, path, parts.query, ''))
+
+    def request(self, method, url, params=None, headers=None, data=None, timeout=None):
+        return self._session.request(
+            method, self._target_url(url), params=params, headers=headers, data=data,
+            timeout=timeout if timeout is not None else self.timeout,
+        )
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self.request('GET', url, params=params, headers=headers, timeout=timeout)
+
+    def post(self, url, params=None, headers=None, data=None, timeout=None):
+        return self.request('POST', url, params=params, headers=headers, data=data, timeout=timeout)
+
+
+class RecordingTransport(LiveTransport):
+    """Sends requests to the network and saves each response as a fixture file."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, **kwargs):
+        super().__init__(**kwargs)
+        self.fixtures_dir = fixtures_dir
+        self._lock = threading.Lock()
+
+    def request(self, method, url, params=None, headers=None, data=None, timeout=None):
+        response = super().request(method, url, params=params, headers=headers, data=data, timeout=timeout)
+        self._save(method, url, params, headers, data, response)
+        return response
+
+    def _save(self, method, url, params, headers, data, response):
+        key = fixture_key(method, url, params, headers, data)
+        content_type = response.headers.get('Content-Type', '')
+        fixture = {
+            'request': {
+                'method': method.upper(),
+                'url': url.split('?')[0],
+                'params': {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS},
+                'headers': {name: headers[name] for name in KEYED_HEADERS if headers and name in headers},
+                'data': data.decode('utf-8') if isinstance(data, bytes) else data,
+            },
+            'response': {
+                'status': response.status_code,
+                'content_type': content_type,
+            },
+        }
+        if _is_text(content_type):
+            fixture['response']['text'] = response.text
+        else:
+            fixture['response']['base64'] = base64.b64encode(response.content).decode('ascii')
+
+        path = fixture_path(self.fixtures_dir, url, key)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(fixture, f, indent=2)
+
+
+def load_fixture(fixtures_dir, method, url, params=None, headers=None, data=None):
+    """Returns the saved fixture for a request, or None if none was recorded."""
+    path = fixture_path(fixtures_dir, url, fixture_key(method, url, params, headers, data))
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def fixture_content(fixture):
+    """Returns the recorded response body of a fixture as bytes."""
+    response = fixture['response']
+    if 'base64' in response:
+        return base64.b64decode(response['base64'])
+    return response.get('text', '').encode('utf-8')
+
+
+class ReplayTransport:
+    """Answers requests from recorded fixtures, deterministically and without network access."""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+
+    def request(self, method, url, params=None, headers=None, data=None, timeout=None):
+        # timeout is accepted for interface compatibility; replaying never waits on the network
+        fixture = load_fixture(self.fixtures_dir, method, url, params, headers, data)
+        if fixture is None:
+            raise requests.exceptions.ConnectionError(f"No recorded fixture for {method.upper()} {url.split('?')[0]}")
+        return ReplayResponse(
+            url,
+            fixture['response']['status'],
+            {'Content-Type': fixture['response'].get('content_type', '')},
+            fixture_content(fixture),
+        )
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self.request('GET', url, params=params, headers=headers, timeout=timeout)
+
+    def post(self, url, params=None, headers=None, data=None, timeout=None):
+        return self.request('POST', url, params=params, headers=headers, data=data, timeout=timeout)
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Returns the process-wide transport selected by EXPLORER_TRANSPORT."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            if TRANSPORT_MODE == 'replay':
+                _transport = ReplayTransport()
+            elif TRANSPORT_MODE == 'record':
+                _transport = RecordingTransport()
+            else:
+                _transport = LiveTransport()
+        return _transport
+
+
+def set_transport(transport):
+    """Replaces the process-wide transport, e.g. from a benchmark script."""
+    global _transport
+    with _transport_lock:
+        _transport = transport
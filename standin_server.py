@@ -0,0 +1,109 @@
+"""
+Local stand-in for the Places, Nominatim and OpenWeatherMap APIs.
+
+Serves responses recorded with EXPLORER_TRANSPORT=record, with optional
+latency and error injection, so the app's I/O paths can be benchmarked and
+load-tested without network access. Point the app at it with:
+
+    EXPLORER_API_HOST_OVERRIDE=http://localhost:8765 streamlit run app.py
+"""
+
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from src.transport import FIXTURES_DIR, KEYED_HEADERS, fixture_content, load_fixture
+
+
+def make_handler(fixtures_dir, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503):
+    """
+    Builds a request handler class serving fixtures from fixtures_dir.
+    Args:
+        fixtures_dir (str): Directory the fixtures were recorded to.
+        latency_ms (float, optional): Delay added to every response.
+        jitter_ms (float, optional): Random extra delay of up to this many milliseconds.
+        error_rate (float, optional): Fraction of requests answered with error_status instead.
+        error_status (int, optional): HTTP status used for injected errors (e.g. 429 or 503).
+    """
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _serve(self, method):
+            body = None
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                body = self.rfile.read(length).decode('utf-8')
+
+            # The first path segment is the real host, e.g. /places.googleapis.com/v1/places:searchText
+            parts = urlsplit(self.path)
+            host, _, path = parts.path.lstrip('/').partition('/')
+            original_url = f"https://{host}/{path}"
+            if parts.query:
+                original_url += f"?{parts.query}"
+            headers = {name: self.headers[name] for name in KEYED_HEADERS if self.headers.get(name)}
+
+            delay = latency_ms + random.uniform(0, jitter_ms)
+            if delay:
+                time.sleep(delay / 1000)
+
+            if random.random() < error_rate:
+                self._respond(error_status, 'application/json',
+                              json.dumps({'error': {'code': error_status, 'message': 'Injected error'}}).encode())
+                return
+
+            fixture = load_fixture(fixtures_dir, method, original_url, headers=headers, data=body)
+            if fixture is None:
+                self._respond(404, 'application/json',
+                              json.dumps({'error': {'code': 404, 'message': f'No fixture for {original_url}'}}).encode())
+                return
+            self._respond(fixture['response']['status'], fixture['response'].get('content_type', ''),
+                          fixture_content(fixture))
+
+        def _respond(self, status, content_type, content):
+            self.send_response(status)
+            if content_type:
+                self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def do_GET(self):
+            self._serve('GET')
+
+        def do_POST(self):
+            self._serve('POST')
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+    return StandInHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded API fixtures locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra delay, up to this value")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected errors")
+    args = parser.parse_args()
+
+    handler = make_handler(args.fixtures_dir, args.latency_ms, args.jitter_ms, args.error_rate, args.error_status)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Serving fixtures from '{args.fixtures_dir}' on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from src.errors import ExplorerError, ServiceBusyError
+from src.sentiment_batcher import SentimentMicroBatcher
+
+
+class SlowPipeline:
+    """Stands in for the model: takes a fixed time per call and records batch sizes."""
+
+    def __init__(self, seconds_per_call=0.02, workers=None):
+        self.seconds_per_call = seconds_per_call
+        if workers:
+            self.workers = workers
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, texts, batch_size=None, truncation=True):
+        with self._lock:
+            self.calls.append(len(texts))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.seconds_per_call)
+        with self._lock:
+            self.running -= 1
+        return [{'label': 'POSITIVE', 'score': 1.0, 'text': text} for text in texts]
+
+
+def _score_concurrently(batcher, callers=10, texts_per_caller=10):
+    results = {}
+
+    def caller(index):
+        texts = [f"caller {index} review {i}" for i in range(texts_per_caller)]
+        results[index] = (texts, batcher(texts))
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+def test_concurrent_callers_are_batched_together():
+    pipeline = SlowPipeline()
+    batcher = SentimentMicroBatcher(pipeline, max_batch_size=32, max_wait_ms=10)
+
+    results = _score_concurrently(batcher)
+
+    # Each caller gets exactly its own results back
+    assert len(results) == 10
+    for texts, scored in results.values():
+        assert [result['text'] for result in scored] == texts
+
+    # 100 texts in batches of up to 32: a handful of calls, not one per text
+    histogram = batcher.stats()['batch_size']
+    assert histogram['count'] == len(pipeline.calls) <= 10
+    assert histogram['buckets']['<=1'] <= 1
+    assert histogram['mean'] >= 10
+
+
+def test_batches_run_in_parallel_on_a_worker_pool():
+    pipeline = SlowPipeline(seconds_per_call=0.05, workers=4)
+    batcher = SentimentMicroBatcher(pipeline, max_batch_size=8, max_wait_ms=5)
+
+    _score_concurrently(batcher)
+
+    assert batcher.max_in_flight == 4
+    assert pipeline.max_running > 1
+    assert sum(pipeline.calls) == 100
+
+
+def test_short_pipeline_answer_fails_every_caller():
+    def drops_last_result(texts, batch_size=None, truncation=True):
+        return [{'label': 'POSITIVE', 'score': 1.0} for _ in texts[:-1]]
+
+    batcher = SentimentMicroBatcher(drops_last_result, max_wait_ms=1, result_timeout=5)
+
+    with pytest.raises(ExplorerError):
+        batcher(["one", "two", "three"])
+
+
+def test_caller_gives_up_on_a_stuck_pipeline():
+    release = threading.Event()
+
+    def stuck(texts, batch_size=None, truncation=True):
+        release.wait()
+        return [{'label': 'POSITIVE', 'score': 1.0} for _ in texts]
+
+    batcher = SentimentMicroBatcher(stuck, max_wait_ms=1, result_timeout=0.2)
+    try:
+        with pytest.raises(ServiceBusyError):
+            batcher(["stuck review"])
+    finally:
+        release.set()
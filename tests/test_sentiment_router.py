@@ -0,0 +1,41 @@
+from src.errors import ServiceBusyError
+from src.sentiment_router import SentimentRouter
+
+
+class FixedModel:
+    """Stands in for a model: labels every text the same and counts calls."""
+
+    def __init__(self, label, queue_depth=0, busy=False):
+        self.label = label
+        self.depth = queue_depth
+        self.busy = busy
+        self.calls = 0
+
+    def queue_depth(self):
+        return self.depth
+
+    def __call__(self, texts, batch_size=None, truncation=True):
+        self.calls += 1
+        if self.busy:
+            raise ServiceBusyError("busy")
+        return [{'label': self.label, 'score': 1.0, 'model': self.label} for _ in texts]
+
+
+def test_deep_transformer_queue_goes_to_the_fast_model():
+    primary = FixedModel('POSITIVE', queue_depth=17)
+    fast = FixedModel('NEGATIVE')
+    router = SentimentRouter(primary, fast, primary_model_id='primary', max_queue_depth=16)
+
+    assert router(["short review"])[0]['label'] == 'NEGATIVE'
+    assert primary.calls == 0
+
+
+def test_busy_transformer_falls_back_to_the_fast_model():
+    primary = FixedModel('POSITIVE', busy=True)
+    fast = FixedModel('NEGATIVE')
+    router = SentimentRouter(primary, fast, primary_model_id='primary')
+
+    results = router(["short review", "another one"])
+
+    assert [result['label'] for result in results] == ['NEGATIVE', 'NEGATIVE']
+    assert router.stats()['routed']['busy_fallback'] == 1
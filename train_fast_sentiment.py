@@ -0,0 +1,67 @@
+"""
+Trains the fast fallback sentiment model (src/sentiment_fast.py) by distilling
+DistilBERT: reviews are labelled by the transformer (reusing the sentiment cache,
+so already-scored reviews cost nothing) and a hashed n-gram linear model is fitted
+to imitate those labels.
+
+    python train_fast_sentiment.py --texts-file reviews.txt
+
+At least MIN_TRAINING_TEXTS unique reviews are required; the recorded fixtures
+alone are usually too few.
+"""
+
+import argparse
+import time
+
+from sklearn.model_selection import train_test_split
+
+from benchmark_sentiment import load_benchmark_texts
+from src.sentiment_fast import FAST_SENTIMENT_MODEL_PATH, train_fast_model
+from src.sentiment_model import load_sentiment_model, score_review_texts
+
+# The app routes to the fast model as soon as the file exists, so a model learnt from
+# a handful of sentences must never be written
+MIN_TRAINING_TEXTS = 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distil the transformer sentiment model into a fast linear model.")
+    parser.add_argument("--texts-file", help="Reviews to learn from, one per line (default: recorded fixtures)")
+    parser.add_argument("--limit", type=int, default=20000, help="Maximum number of reviews to use")
+    parser.add_argument("--output", default=FAST_SENTIMENT_MODEL_PATH)
+    parser.add_argument("--test-size", type=float, default=0.2, help="Fraction held out to measure agreement")
+    parser.add_argument("--min-texts", type=int, default=MIN_TRAINING_TEXTS,
+                        help="Refuse to train on fewer unique reviews than this")
+    args = parser.parse_args()
+
+    texts = list(dict.fromkeys(load_benchmark_texts(args.texts_file, limit=args.limit)))
+    if len(texts) < args.min_texts:
+        parser.error(f"only {len(texts)} unique reviews found, at least {args.min_texts} are needed "
+                     "(pass a larger --texts-file)")
+    print(f"Labelling {len(texts)} reviews with the transformer model...")
+    scores = score_review_texts(load_sentiment_model('pytorch'), texts)
+    labelled = [(text, sentiment['label']) for text, (sentiment, _) in zip(texts, scores) if sentiment]
+    texts = [text for text, _ in labelled]
+    labels = [label for _, label in labelled]
+    if len(texts) < args.min_texts:
+        parser.error(f"only {len(texts)} reviews could be labelled, at least {args.min_texts} are needed")
+
+    train_texts, test_texts, train_labels, test_labels = train_test_split(
+        texts, labels, test_size=args.test_size, random_state=42, stratify=labels
+    )
+    model = train_fast_model(train_texts, train_labels, args.output)
+
+    start = time.perf_counter()
+    predictions = model(test_texts)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    agreement = sum(p['label'] == label for p, label in zip(predictions, test_labels)) / max(1, len(test_labels))
+    print(f"Agreement with the transformer on {len(test_labels)} held-out reviews: {agreement:.1%}")
+    print(f"Scoring time: {elapsed_ms / max(1, len(test_labels)):.3f} ms per review")
+
+    # The final model learns from every labelled review
+    train_fast_model(texts, labels, args.output)
+    print(f"Saved fast sentiment model to {args.output}")
+
+
+if __name__ == "__main__":
+    main()